@@ -0,0 +1,745 @@
+import csv
+import io
+import json
+import mmap
+import os
+import re
+from functools import reduce
+from itertools import repeat
+
+from categories import default_rules
+from profiling import NULL_PROFILE
+
+# ROWS PER CHUNK; PARTIAL RESULTS, PROGRESS AND CANCEL CHECKS HAPPEN BETWEEN CHUNKS
+CHUNK_ROWS = 5000
+SENTIMENTS = ('Positive', 'Neutral', 'Negative')
+
+
+class AnalysisError(Exception):
+    """An analysis run failed; title and message are meant for the popup."""
+
+    def __init__(self, title, message):
+        super().__init__(title, message)
+        self.title = title
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+class AnalysisCancelled(Exception):
+    """The cancel event of an analysis run was set."""
+
+
+# STAR VALUES AS THEY APPEAR IN THE EXPORT, 0 MEANS UNANSWERED
+STARS = {str(star): star for star in range(1, 6)}
+
+# ASCII DIGIT -> STAR VALUE, FOR bytes.translate; BYTES PARSED AT A TIME BY read_chunks_mmap
+STAR_BYTES = bytes(STARS.get(chr(byte), 0) for byte in range(256))
+MMAP_BLOCK = 1 << 16
+MADV_DONTNEED = getattr(mmap, 'MADV_DONTNEED', None)
+
+# 'csv' OR 'mmap', SEE READERS
+INGEST_MODE = os.environ.get('INGEST_MODE', 'csv')
+
+
+class RatingStore:
+    """
+    Column-oriented star ratings.
+
+    Every rating column keeps one byte per row (0 when the cell is empty or
+    not a 1-5 rating). The category -> subcategory -> column index layout is
+    resolved once from the category rules, so adding a row only touches the
+    rating columns and histograms are plain bytearray counts. The per-column
+    counts are kept between calls and only the rows added since are counted,
+    so asking for histograms after every chunk stays linear in the rows.
+    """
+
+    def __init__(self, header, rules=None):
+        rules = rules or default_rules()
+        category_map = rules.categorize(header)
+        category_of = {name: category for category, names in category_map.items() for name in names}
+
+        self.header = header
+        self.rows = 0
+        self.layout = {}
+        self.columns = {}
+        for index in range(rules.metadata_columns, len(header)):
+            name = header[index]
+            category = category_of.get(name)
+            if category is None or category in rules.text_categories:
+                continue
+            self.layout.setdefault(category, {}).setdefault(name, []).append(index)
+            self.columns[index] = bytearray()
+
+        self._width = max(self.columns, default=-1) + 1
+        self._columns = list(self.columns.items())
+        self._counts = {index: [0, 0, 0, 0, 0] for index in self.columns}
+        self._counted = 0
+
+    def add_row(self, row):
+        if len(row) < self._width:
+            row = row + [''] * (self._width - len(row))
+        for index, column in self._columns:
+            value = row[index]
+            column.append(STARS.get(value) or STARS.get(value.strip(), 0))
+        self.rows += 1
+
+    def rating_columns(self):
+        """Header indices of the rating columns, in the order extend_stars expects."""
+        return [index for index, column in self._columns]
+
+    def extend_stars(self, stars, rows):
+        """Adds rows given as one bytes of star values (0 to 5) per rating column."""
+        for (index, column), values in zip(self._columns, stars):
+            column.extend(values)
+        self.rows += rows
+
+    def categories(self):
+        return list(self.layout)
+
+    def _count_new_rows(self):
+        if self._counted == self.rows:
+            return
+        for index, column in self._columns:
+            counts = self._counts[index]
+            for star in range(5):
+                counts[star] += column.count(star + 1, self._counted)
+        self._counted = self.rows
+
+    def histogram(self, indices):
+        """Number of 1..5 star answers over the given columns."""
+        self._count_new_rows()
+        counts = [0, 0, 0, 0, 0]
+        for index in indices:
+            for star, votes in enumerate(self._counts[index]):
+                counts[star] += votes
+        return counts
+
+    def histograms(self, category):
+        """Group subcategories and aggregate stars."""
+        return [
+            {"subcategory": subcategory, "stars": self.histogram(indices)}
+            for subcategory, indices in self.layout.get(category, {}).items()
+        ]
+
+
+# VERDICT
+def rating_verdict(weighted_average):
+    """Result text and color shown for a subcategory's average rating."""
+    if weighted_average >= 4.8:
+        return "Very Satisfactory", "#00FF00"
+    elif 3.5 <= weighted_average < 4.8:
+        return "Satisfactory", "#FFA500"
+    elif 2.5 <= weighted_average < 3.5:
+        return "Needs Improvement", "#FFCC00"
+    return "Needs Enhancement", "#FF0000"
+
+
+def summarize_subcategory(category, subcategory, stars):
+    """Everything the dashboard shows for one subcategory."""
+    total_votes = sum(stars)
+    if total_votes > 0:
+        percentages = [(votes / total_votes) * 100 for votes in stars]
+        weighted_average = sum((i + 1) * stars[i] for i in range(5)) / total_votes
+    else:
+        percentages = [0, 0, 0, 0, 0]
+        weighted_average = 0
+
+    result_text, result_color = rating_verdict(weighted_average)
+    return {
+        "category": category,
+        "subcategory": subcategory,
+        "name": re.sub(r'^\d+\.\s*', '', subcategory),
+        "stars": stars,
+        "percentages": percentages,
+        "weighted_average": weighted_average,
+        "result_text": result_text,
+        "result_color": result_color,
+    }
+
+
+# SUMMARY
+class SurveySummary:
+    """
+    Mergeable result of analyzing one or more survey files.
+
+    Only counts are kept: the star histogram of every (category,
+    subcategory), the sentiment counts and the number of rows, plus the
+    files they came from. Percentages, weighted averages and verdicts are
+    derived from those counts, so merging two summaries (adding the counts)
+    is associative and a rollup gives the same dashboard as analyzing all
+    the rows together. Categories and subcategories keep the order in
+    which they were first seen.
+    """
+
+    VERSION = 1
+
+    def __init__(self, histograms=None, sentiments=None, rows=0, files=()):
+        self.histograms = histograms if histograms is not None else {}
+        self.sentiments = dict.fromkeys(SENTIMENTS, 0)
+        if sentiments:
+            self.sentiments.update((sentiment, sentiments[sentiment]) for sentiment in SENTIMENTS)
+        self.rows = rows
+        self.files = list(files)
+
+    @classmethod
+    def from_store(cls, store, sentiments=None, files=()):
+        histograms = {
+            category: {item["subcategory"]: item["stars"] for item in store.histograms(category)}
+            for category in store.categories()
+        }
+        return cls(histograms, sentiments, store.rows, files)
+
+    @property
+    def comments(self):
+        return sum(self.sentiments.values())
+
+    def merge(self, other):
+        """A new summary with the counts of both."""
+        histograms = {
+            category: {subcategory: list(stars) for subcategory, stars in subcategories.items()}
+            for category, subcategories in self.histograms.items()
+        }
+        for category, subcategories in other.histograms.items():
+            merged = histograms.setdefault(category, {})
+            for subcategory, stars in subcategories.items():
+                counts = merged.setdefault(subcategory, [0, 0, 0, 0, 0])
+                for star, votes in enumerate(stars):
+                    counts[star] += votes
+
+        sentiments = {sentiment: self.sentiments[sentiment] + other.sentiments[sentiment] for sentiment in SENTIMENTS}
+        return SurveySummary(histograms, sentiments, self.rows + other.rows, self.files + other.files)
+
+    __add__ = merge
+
+    @classmethod
+    def combine(cls, summaries):
+        return reduce(cls.merge, summaries, cls())
+
+    def summary_index(self):
+        """
+        Precomputes the summary of every (category, subcategory).
+
+        Returns a list of (category, [summary, ...]) in display order so that
+        moving between subcategories is a plain index lookup.
+        """
+        return [
+            (category, [
+                summarize_subcategory(category, subcategory, stars)
+                for subcategory, stars in subcategories.items()
+            ])
+            for category, subcategories in self.histograms.items()
+        ]
+
+    def sentiment_percentages(self):
+        total = self.comments
+        return {sentiment: (count / total) * 100 if total else 0 for sentiment, count in self.sentiments.items()}
+
+    # PERSIST
+    def to_dict(self):
+        """JSON-friendly form; "categories" and the percentages are for readers, from_dict ignores them."""
+        return {
+            "version": self.VERSION,
+            "files": self.files,
+            "rows": self.rows,
+            "sentiments": self.sentiments,
+            "histograms": self.histograms,
+            "sentiment_percentages": self.sentiment_percentages(),
+            "categories": [
+                {
+                    "category": category,
+                    "subcategories": [
+                        {field: item[field] for field in ("subcategory", "percentages", "weighted_average", "result_text")}
+                        for item in subcategories
+                    ],
+                }
+                for category, subcategories in self.summary_index()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported summary version: {data.get('version')}")
+        return cls(data["histograms"], data["sentiments"], data["rows"], data["files"])
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+# INGEST
+class HashingReader(io.RawIOBase):
+    """Binary file that feeds every byte read from it to a hashlib digest."""
+
+    def __init__(self, file, digest):
+        self.file = file
+        self.digest = digest
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self.file.readinto(buffer)
+        if count:
+            self.digest.update(memoryview(buffer)[:count])
+        return count
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+def open_text(csv_file, digest=None):
+    """The survey opened for csv.reader; with a digest, every byte read also goes into it."""
+    if digest is None:
+        return open(csv_file, 'r', encoding='utf-8', newline='')
+    raw = HashingReader(open(csv_file, 'rb', buffering=0), digest)
+    return io.TextIOWrapper(io.BufferedReader(raw), encoding='utf-8', newline='')
+
+
+def read_chunks(csv_file, chunk_rows=CHUNK_ROWS, rows=None, digest=None):
+    """
+    Reads the survey in a single pass, chunk_rows rows at a time.
+
+    Every row is added to one growing RatingStore and its comment to the
+    current chunk, so no row is kept after it has been consumed. Yields
+    (store, chunk comments, fraction of the file read) after every chunk and
+    once more at the end; the comments are None when there is no comment
+    column. When a rows list is given, the raw rows are appended to it too;
+    the caller empties it after each chunk. A hashlib digest given as
+    digest is fed the whole file content by the same read, so the result
+    cache key costs no second pass over the file.
+    """
+    size = os.path.getsize(csv_file) or 1
+    rules = default_rules()
+
+    with open_text(csv_file, digest) as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        store = RatingStore(header, rules)
+        comment_index = rules.find_comment_column(header)
+
+        comments = None if comment_index is None else []
+        for row in reader:
+            store.add_row(row)
+            if rows is not None:
+                rows.append(row)
+            if comment_index is not None:
+                comments.append(row[comment_index] if comment_index < len(row) else '')
+
+            if store.rows % chunk_rows == 0:
+                yield store, comments, file.buffer.tell() / size
+                comments = None if comment_index is None else []
+
+        yield store, comments, 1.0
+
+
+def read_chunks_mmap(csv_file, chunk_rows=CHUNK_ROWS, digest=None):
+    """
+    Same chunks as read_chunks, parsed from a memory-mapped file.
+
+    The file is parsed in blocks of whole records of about MMAP_BLOCK
+    bytes, so the fields of only a few hundred rows exist at a time, and
+    a chunk is yielded once it has at least chunk_rows rows. One regular
+    expression built from the header (see _record_pattern) runs over the
+    mapped block without copying it and
+    captures only the rating and comment fields of every record, quoted
+    ones included; the other fields are skipped, never split out or
+    decoded. A rating column of single digits becomes star values with one
+    bytes.translate and only the comments are decoded into strings. A
+    block with a record the expression does not cover (a short row, a
+    blank line, a stray quote or carriage return) falls back to the csv
+    module on the decoded block. A digest is fed every block as it is
+    parsed, like in read_chunks.
+    """
+    rules = default_rules()
+    size = os.path.getsize(csv_file)
+    if size == 0:
+        yield RatingStore([], rules), None, 1.0
+        return
+
+    with open(csv_file, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        header, pos = _parse_record(buf, 0, size)
+        store = RatingStore(header, rules)
+        comment_index = rules.find_comment_column(header)
+        rating_columns = store.rating_columns()
+        records, group = _record_pattern(rating_columns, comment_index)
+
+        # The final line break does not start another row.
+        stop = size - 1 if buf[size - 1] == ord('\n') else size
+        released = 0
+        hashed = 0
+        chunk_start = 0
+        comments = []
+        while pos <= stop:
+            end = _block_end(buf, pos, MMAP_BLOCK, stop)
+
+            # Every record matches, or the last group (anything up to a line break) is set. Without
+            # any field to capture findall would give bytes instead of tuples, so csv reads those.
+            fields = list(zip(*records.findall(buf, pos, min(end + 1, size)))) if group else None
+            if fields and not any(fields[-1]):
+                store.extend_stars([_stars(fields[group[index]]) for index in rating_columns], len(fields[0]))
+                if comment_index is not None:
+                    quoted, plain = group[comment_index]
+                    comments.extend(_texts(fields[quoted], fields[plain]))
+            else:
+                # The newline keeps an empty last line as an (empty) row.
+                for row in csv.reader(io.StringIO(buf[pos:end].decode('utf-8') + '\n', newline='')):
+                    store.add_row(row)
+                    if comment_index is not None:
+                        comments.append(row[comment_index] if comment_index < len(row) else '')
+
+            pos = end + 1
+            if digest is not None:
+                hashed = _hash_range(digest, buf, hashed, min(pos, size))
+            if store.rows - chunk_start < chunk_rows and pos <= stop:
+                continue
+            yield store, (comments if comment_index is not None else None), min(pos / size, 1.0)
+            chunk_start = store.rows
+            comments = []
+
+            # Pages already parsed are dropped so they do not stay resident.
+            if MADV_DONTNEED is not None:
+                done = pos // mmap.PAGESIZE * mmap.PAGESIZE
+                if done > released:
+                    buf.madvise(MADV_DONTNEED, released, done - released)
+                    released = done
+
+        if digest is not None:
+            _hash_range(digest, buf, hashed, size)
+        if store.rows == 0:
+            yield store, (None if comment_index is None else []), 1.0
+
+
+# ONE CSV FIELD AS THE csv MODULE READS IT: UP TO THE NEXT COMMA, OR QUOTED WITH DOUBLED QUOTES INSIDE
+CSV_FIELD = rb'(?:[^,"\r\n][^,\r\n]*|"[^"]*(?:""[^"]*)*"|)'
+TEXT_FIELD = rb'(?:([^,"\r\n][^,\r\n]*)|"([^"]*(?:""[^"]*)*)"|)'
+QUOTE = re.compile(rb'"')
+
+
+def _record_pattern(rating_columns, text_column=None):
+    """
+    (expression, groups) for one whole record that has all the given
+    columns. The expression captures every rating field as it is (quotes
+    kept) and the text field as its unquoted value and the inside of its
+    quotes, one of them empty; a last group instead takes the rest of a
+    line the record does not match, so findall never skips a byte. groups
+    maps a column to the position of its capture in the findall tuples,
+    to a (quoted, unquoted) pair for the text column; it is empty when
+    there is nothing to capture.
+    """
+    wanted = set(rating_columns) | ({text_column} - {None})
+    fields = []
+    groups = {}
+    count = 0
+    for index in range(max(wanted, default=-1) + 1):
+        if index == text_column:
+            # TEXT_FIELD captures the unquoted value first.
+            groups[index] = (count + 1, count)
+            fields.append(TEXT_FIELD)
+            count += 2
+        elif index in wanted:
+            groups[index] = count
+            fields.append(b'(' + CSV_FIELD + b')')
+            count += 1
+        else:
+            fields.append(CSV_FIELD)
+    pattern = b','.join(fields) + rb'(?:,' + CSV_FIELD + rb')*\r?(?:\n|\Z)'
+    return re.compile(rb'(?s)(?=.)(?:' + pattern + rb'|([^\n]*\n?))'), groups
+
+
+def _unquote(value):
+    return value[1:-1].replace(b'""', b'"') if value[:1] == b'"' else value
+
+
+def _texts(quoted, plain):
+    """Decoded fields of one text column of a block, from the two captures of _record_pattern."""
+    if not any(quoted):
+        # Only a quoted field can hold a line break.
+        return b'\n'.join(plain).decode('utf-8').split('\n')
+    quoted = map(bytes.replace, quoted, repeat(b'""'), repeat(b'"'))
+    return list(map(bytes.decode, map(bytes.__add__, quoted, plain)))
+
+
+def _hash_range(digest, buf, start, end):
+    """Feeds buf[start:end] to the digest without copying it; returns end."""
+    with memoryview(buf) as view, view[start:end] as part:
+        digest.update(part)
+    return end
+
+
+def _block_end(buf, pos, block_bytes, size):
+    """End (a newline outside quotes, or the file end) of a block of records."""
+    if pos + block_bytes >= size:
+        return size
+    end = buf.rfind(b'\n', pos, pos + block_bytes)
+    if end == -1:
+        end = buf.find(b'\n', pos + block_bytes)
+        if end == -1:
+            return size
+    # An odd number of quotes means the newline is inside a quoted field.
+    while buf.find(b'"', pos, end) != -1 and len(QUOTE.findall(buf, pos, end)) % 2:
+        end = buf.find(b'\n', end + 1)
+        if end == -1:
+            return size
+    return end
+
+
+def _stars(values):
+    """Star values (0 when not a 1-5 rating) of one rating column of a block."""
+    digits = b''.join(values)
+    # One byte per row only if no value is empty (an empty one could hide a longer one).
+    if len(digits) == len(values) and b'' not in values:
+        return digits.translate(STAR_BYTES)
+    return bytes(
+        STAR_BYTES[value[0]] if len(value) == 1 else STARS.get(_unquote(value).decode('utf-8', 'replace').strip(), 0)
+        for value in values
+    )
+
+
+def _parse_record(buf, pos, size):
+    """One CSV record decoded with the csv module; returns (fields, next position)."""
+    end = buf.find(b'\n', pos)
+    while end != -1 and buf[pos:end].count(b'"') % 2:
+        end = buf.find(b'\n', end + 1)
+    if end == -1:
+        end = size
+    text = buf[pos:end].decode('utf-8')
+    return next(csv.reader(io.StringIO(text, newline='')), []), end + 1
+
+
+READERS = {'csv': read_chunks, 'mmap': read_chunks_mmap}
+
+
+def ingest_csv(csv_file):
+    """Reads the whole survey; returns the RatingStore and all comments."""
+    all_comments = []
+    for store, comments, fraction in read_chunks(csv_file):
+        if comments is None:
+            all_comments = None
+        else:
+            all_comments.extend(comments)
+    return store, all_comments
+
+
+def check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise AnalysisCancelled()
+
+
+# ANALYZE
+def classify_comments(comments, model, cache, profile=NULL_PROFILE):
+    """
+    Sentiment of every comment, in order.
+
+    Only the distinct comments missing from the cache go through the model,
+    as one batch, and only those are appended to the cache.
+    """
+    return submit_comments(comments, model, cache, profile)()
+
+
+def submit_comments(comments, model, cache, profile=NULL_PROFILE):
+    """
+    classify_comments without waiting for the model: starts the batch
+    (see SentimentModel.submit) and returns a function that collects the
+    predictions, caches them and gives the sentiments.
+    """
+    with profile.stage("cache_lookup"):
+        sentiments = {comment: cache.get(comment) for comment in dict.fromkeys(comments)}
+        uncached = [comment for comment, sentiment in sentiments.items() if sentiment is None]
+    profile.count("comments", len(comments))
+    profile.count("distinct_comments", len(sentiments))
+    profile.count("predicted_comments", len(uncached))
+
+    with profile.stage("predict"):
+        predicted = model.submit(uncached)
+
+    def collect():
+        with profile.stage("predict"):
+            predictions = list(zip(uncached, predicted()))
+        sentiments.update(predictions)
+
+        with profile.stage("cache_save"):
+            cache.update(predictions)
+            cache.flush()
+        return [sentiments[comment] for comment in comments]
+
+    return collect
+
+
+def analyze_csv(csv_file, model, cache, on_chunk=None, cancel_event=None, chunk_rows=CHUNK_ROWS,
+                result_cache=None, ingest_mode=INGEST_MODE, export=None, profile=NULL_PROFILE, digest=None):
+    """
+    Runs the whole analysis of one survey file without touching the UI.
+
+    The file is processed chunk by chunk: each chunk's ratings go into the
+    store and its comments are sent to the model, then the comments of
+    the chunk before are counted, so the sentiment counts are running
+    totals one chunk behind the ratings. With a parallel model the pool
+    works on a chunk while the next one is read and queued. After every
+    chunk a result dict is built with the SurveySummary of the rows so
+    far, its summary_index and the fraction of the file done; on_chunk
+    gets each of these partial results and the last one, with everything
+    counted, is returned. The first chunk also goes to on_chunk before its
+    comments are classified, so the star histograms show up without
+    waiting for the sentiment model to load.
+
+    With a result_cache (see result_cache.ResultCache), a file whose content
+    was analyzed before is not read at all: its cached summary is returned
+    as the only result, and a newly computed summary is stored there under
+    the content hash taken in the same read. A hashlib object given as
+    digest is fed the bytes of the file as it is read, for callers that
+    store the result themselves (cli.py).
+
+    ingest_mode picks the reader from READERS: 'csv' (read_chunks) or
+    'mmap' (read_chunks_mmap); both give the same results.
+
+    With an export (see export.AnnotatedWriter), every row is written out
+    with its predicted sentiment as soon as its chunk is classified. The
+    rows have to be read for that, so the file is always read with
+    read_chunks and a result_cache hit is not used. When writing fails
+    (disk full, folder not writable...), the export is closed and the
+    analysis goes on; the results carry the reason as "export_error".
+
+    A profiling.RunProfile given as profile gets the time of every stage
+    (reading, cache lookups, prediction, summaries...) and the row and
+    comment counts of the run.
+
+    The star ratings do not need the sentiment model: when it cannot run
+    (not installed on the device, broken artifacts...), the rest of the
+    file is analyzed without sentiments and the results carry the reason
+    as "sentiment_error"; such a summary is not put in the result_cache.
+
+    Other failures are raised as AnalysisError, a set cancel_event as
+    AnalysisCancelled. on_chunk is called from whatever thread runs this
+    function.
+    """
+    fingerprint = None
+    if result_cache is not None:
+        with profile.stage("result_cache"):
+            try:
+                fingerprint = result_cache.fingerprint(csv_file)
+                summary = result_cache.lookup(csv_file, fingerprint) if export is None else None
+            except OSError as e:
+                raise AnalysisError("File Read Error", f"Error reading the file: {e}")
+        if summary is not None:
+            profile.count("result_cache_hits")
+            profile.count("rows", summary.rows)
+            return {"summary": summary, "summary_index": summary.summary_index(), "fraction": 1.0}
+        if digest is None:
+            digest = result_cache.content_digest()
+
+    counts = dict.fromkeys(SENTIMENTS, 0)
+    if export is None:
+        rows = None
+        chunks = READERS[ingest_mode](csv_file, chunk_rows, digest=digest)
+    else:
+        rows = []
+        chunks = read_chunks(csv_file, chunk_rows, rows, digest)
+    export_started = False
+    sentiment_error = None
+    export_error = None
+    result = None
+    pending = None
+
+    def chunk_result(store, fraction):
+        with profile.stage("summary"):
+            summary = SurveySummary.from_store(store, counts, [csv_file])
+            return {
+                "summary": summary,
+                "summary_index": summary.summary_index(),
+                "fraction": fraction,
+                "sentiment_error": sentiment_error,
+                "export_error": export_error,
+            }
+
+    def submit(comments):
+        """Function collecting the sentiments of the comments, or None without any."""
+        nonlocal sentiment_error
+        if not comments or sentiment_error is not None:
+            return None
+        try:
+            return submit_comments(comments, model, cache, profile)
+        except Exception as e:
+            sentiment_error = f"Error running the sentiment model: {e}"
+            print(f"Warning: {sentiment_error}")
+            return None
+
+    def count(header, chunk_rows, collect):
+        """Adds the sentiments of a submitted chunk to the counts, and exports its rows."""
+        nonlocal sentiment_error, export_started, export_error
+        predicted_sentiments = None
+        if collect is not None and sentiment_error is None:
+            try:
+                predicted_sentiments = collect()
+            except Exception as e:
+                sentiment_error = f"Error running the sentiment model: {e}"
+                print(f"Warning: {sentiment_error}")
+            else:
+                for sentiment in SENTIMENTS:
+                    counts[sentiment] += predicted_sentiments.count(sentiment)
+
+        if export is not None and export_error is None:
+            try:
+                with profile.stage("export"):
+                    if not export_started:
+                        export.start(header)
+                        export_started = True
+                    export.write(chunk_rows, predicted_sentiments or [None] * len(chunk_rows))
+            except OSError as e:
+                # THE SUMMARY DOES NOT NEED THE EXPORT, ONLY THE REST OF THE ROWS ARE NOT WRITTEN
+                export_error = f"Error writing {export.path}: {e}"
+                print(f"Warning: {export_error}")
+                try:
+                    export.close()
+                except OSError:
+                    pass
+
+    while True:
+        check_cancelled(cancel_event)
+        try:
+            with profile.stage("read"):
+                store, comments, fraction = next(chunks)
+        except StopIteration:
+            break
+        except Exception as e:
+            raise AnalysisError("File Read Error", f"Error reading the file: {e}")
+
+        # THE FIRST STAR HISTOGRAMS DO NOT WAIT FOR THE MODEL TO LOAD
+        if pending is None and comments and on_chunk is not None:
+            on_chunk(chunk_result(store, fraction))
+
+        # THE MODEL STARTS ON THIS CHUNK BEFORE THE PREVIOUS ONE IS WAITED FOR
+        submitted = (store.header, None if rows is None or export_error else rows[:], submit(comments))
+        if rows is not None:
+            rows.clear()
+        if pending is not None:
+            count(*pending)
+            result = chunk_result(store, fraction)
+            if on_chunk is not None:
+                on_chunk(result)
+        pending = submitted
+
+    check_cancelled(cancel_event)
+    count(*pending)
+    result = chunk_result(store, fraction)
+    if on_chunk is not None:
+        on_chunk(result)
+    profile.count("rows", store.rows)
+    if fingerprint is not None and sentiment_error is None:
+        try:
+            with profile.stage("result_cache"):
+                result_cache.store(csv_file, fingerprint, digest.hexdigest(), result["summary"])
+        except OSError as e:
+            print(f"Warning: could not cache the result of {csv_file}: {e}")
+    return result
@@ -0,0 +1,87 @@
+"""
+Frame times of the dashboard while next_subcategory is pressed rapidly,
+wrapping around to the first subcategory at the end. The app shows the
+summary of a synthetic survey (no sentiment model needed) and a press is
+made every interval seconds. Needs a display (or a virtual one such as
+Xvfb).
+
+    python benchmarks/bench_charts.py [presses] [interval]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from synthetic import write_survey
+
+SETTLE_SECONDS = 1.0
+
+
+def synthetic_result(rows=2000):
+    from analysis import SurveySummary, ingest_csv
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = write_survey(os.path.join(tmp, 'survey.csv'), rows)
+        store, comments = ingest_csv(csv_file)
+    summary = SurveySummary.from_store(store, {'Positive': 1200, 'Neutral': 500, 'Negative': 300}, [csv_file])
+    return {"summary": summary, "summary_index": summary.summary_index(), "fraction": 1.0}
+
+
+def main(presses, interval):
+    os.chdir(ROOT)
+    import main as app_module
+    from kivy.clock import Clock
+    from kivy.core.window import Window
+
+    result = synthetic_result()
+    frames = []
+
+    class ChartBenchmarkApp(app_module.MainApp):
+
+        def on_first_frame(self, window):
+            Window.unbind(on_flip=self.on_first_frame)
+            self.main_widget.show_result(result)
+            self.presses = 0
+            Clock.schedule_once(self.start, SETTLE_SECONDS)
+
+        def start(self, dt):
+            self.last_flip = time.perf_counter()
+            Window.bind(on_flip=self.on_frame)
+            self.press_event = Clock.schedule_interval(self.press, interval)
+
+        def on_frame(self, window):
+            now = time.perf_counter()
+            frames.append(now - self.last_flip)
+            self.last_flip = now
+
+        def press(self, dt):
+            widget = self.main_widget
+            if (widget.current_index == len(widget.summary_index) - 1
+                    and widget.sub_current_index == len(widget.sub_category_list) - 1):
+                widget.current_index = widget.sub_current_index = 0
+                widget.update_subcategory_data()
+            else:
+                widget.next_subcategory()
+            self.presses += 1
+            if self.presses >= presses:
+                self.press_event.cancel()
+                Clock.schedule_once(lambda dt: self.stop(), app_module.PARTIAL_RESULT_INTERVAL + 0.5)
+
+    ChartBenchmarkApp().run()
+
+    milliseconds = sorted(frame * 1000 for frame in frames)
+    print(f"{presses} presses every {interval * 1000:.0f} ms, {len(milliseconds)} frames")
+    print(f"{'median ms':>10} {'p95 ms':>8} {'max ms':>8} {'> 17 ms':>8} {'> 33 ms':>8}")
+    print(f"{statistics.median(milliseconds):>10.1f} {milliseconds[int(len(milliseconds) * 0.95)]:>8.1f} "
+          f"{milliseconds[-1]:>8.1f} {sum(ms > 1000 / 60 for ms in milliseconds):>8} "
+          f"{sum(ms > 1000 / 30 for ms in milliseconds):>8}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 0.02)
@@ -0,0 +1,59 @@
+"""
+Prediction time over the distinct raw comments of a duplicate-heavy
+column (SAMPLE_COMMENTS with random case, spacing and punctuation, plus a
+share of free-form comments): vectorizing every distinct string against
+SentimentModel.predict, which vectorizes each canonical key once. Also
+checks that both give the same labels.
+
+    python benchmarks/bench_dedup.py [comments] [free-form share, e.g. 0.1]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from sentiment import SentimentModel
+from synthetic import SAMPLE_COMMENTS, make_comments
+
+
+def noisy_comments(count, free_share, seed=0):
+    rng = random.Random(seed)
+    free = iter(make_comments(count, seed, words=8))
+    comments = []
+    for _ in range(count):
+        if rng.random() < free_share:
+            comments.append(next(free))
+            continue
+        text = ''.join(char.upper() if rng.random() < 0.3 else char for char in rng.choice(SAMPLE_COMMENTS))
+        comments.append(rng.choice(['', ' ']) + text + rng.choice(['', '.', '!', ' ']))
+    return comments
+
+
+def main(count, free_share):
+    model = SentimentModel(workers=1)
+    model.load()
+    distinct = list(dict.fromkeys(noisy_comments(count, free_share)))
+    keys = len(set(map(model.canonical_key, distinct)))
+
+    start = time.perf_counter()
+    features = model.vectorizer.transform(distinct)
+    every_string = model.encoder.inverse_transform(model.model.predict(features)).tolist()
+    raw_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    canonical = model.predict(distinct)
+    canonical_seconds = time.perf_counter() - start
+
+    print(f"{count} comments, {len(distinct)} distinct strings, {keys} canonical keys "
+          f"({1 - keys / len(distinct):.0%} duplicates)")
+    print(f"{'vectorized':>12} {'seconds':>10}")
+    print(f"{'every string':>12} {raw_seconds:>10.3f}")
+    print(f"{'canonical':>12} {canonical_seconds:>10.3f}")
+    print("same labels" if canonical == every_string else "LABELS DIFFER")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 0.1)
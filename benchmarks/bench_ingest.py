@@ -0,0 +1,112 @@
+"""
+Compares ingest_csv (single pass, columnar RatingStore) against the old
+path of MainWidget.open_csv: csv.DictReader into full_df, then a second
+csv.reader pass building one dict per rating cell.
+
+    python benchmarks/bench_ingest.py [rows ...]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from analysis import ingest_csv
+from categories import categorize_columns
+from synthetic import write_survey
+
+
+def add_ratings(result, category_map, row):
+    row_index = 4
+    for category, subcategories in category_map.items():
+        category_data = next((item for item in result if item["category"] == category), None)
+        if not category_data:
+            category_data = {"category": category, "subcategories": []}
+            result.append(category_data)
+
+        for subcat in subcategories:
+            try:
+                if "Feedback" not in category:
+                    stars = int(row[row_index])
+                    category_data["subcategories"].append({"subcategory": subcat, "stars": stars})
+                else:
+                    feedback = row[row_index]
+                    category_data["subcategories"].append({"subcategory": subcat, "text": feedback})
+                row_index += 1
+            except:
+                pass
+
+
+def histograms(structured_data):
+    counts = {}
+    for category_data in structured_data:
+        for item in category_data["subcategories"]:
+            if "stars" in item:
+                key = (category_data["category"], item["subcategory"])
+                counts.setdefault(key, [0, 0, 0, 0, 0])[item["stars"] - 1] += 1
+    return counts
+
+
+def store_histograms(store):
+    return {
+        (category, item["subcategory"]): item["stars"]
+        for category in store.categories()
+        for item in store.histograms(category)
+    }
+
+
+def two_pass(csv_file):
+    with open(csv_file, 'r', encoding='utf-8') as file:
+        full_df = [row for row in csv.DictReader(file)]
+
+    structured_data = []
+    with open(csv_file, 'r', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        category_map = categorize_columns(next(reader))
+        for row in reader:
+            add_ratings(structured_data, category_map, row)
+
+    target = None
+    for col in ['comment', 'comments', 'review', 'text']:
+        for key in full_df[0].keys():
+            if col in key.lower():
+                target = [row[key] for row in full_df]
+                break
+        if target:
+            break
+    return structured_data, target
+
+
+def measure(func, csv_file, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(csv_file)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(csv_file)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'rows':>10} {'path':>12} {'seconds':>10} {'us/row':>8} {'peak MB':>10}")
+        for rows in sizes:
+            csv_file = write_survey(os.path.join(tmp, f"survey_{rows}.csv"), rows)
+            legacy_data, legacy_comments = two_pass(csv_file)
+            store, comments = ingest_csv(csv_file)
+            assert legacy_comments == comments
+            assert histograms(legacy_data) == store_histograms(store)
+            for name, func in (("two-pass", two_pass), ("single-pass", ingest_csv)):
+                seconds, peak = measure(func, csv_file)
+                print(f"{rows:>10} {name:>12} {seconds:>10.3f} {seconds / rows * 1e6:>8.2f} {peak / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
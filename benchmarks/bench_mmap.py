@@ -0,0 +1,91 @@
+"""
+Throughput (MB/s) and peak RSS of read_chunks (csv module) against
+read_chunks_mmap on a synthetic survey export of the given size, once
+with plain comments and once with quoted ones (commas, doubled quotes
+and line breaks inside the comment, as free-text answers often have).
+Each reader runs in its own process so the peak RSS figures are
+independent.
+
+    python benchmarks/bench_mmap.py [size in MB, e.g. 4096] [path]
+"""
+import csv
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from synthetic import COMMENTS, METADATA, RATINGS, SAMPLE_COMMENTS, write_survey
+
+ROW_BYTES = 200
+QUOTED_COMMENTS = SAMPLE_COMMENTS + [
+    "Good, but the program started late.",
+    'The "icebreaker" was fun, thank you!',
+    "Well organized.\nPlease add more seats next time.",
+]
+
+
+def write_quoted_survey(path, rows, seed=0):
+    """Like synthetic.write_survey, with comments the csv writer has to quote."""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(METADATA + RATINGS + [COMMENTS])
+        for i in range(rows):
+            writer.writerow(["2024/01/01 8:00:00", f"student{i}@ccc.edu.ph", f"Student {i}", "BSCS"]
+                            + [rng.randint(1, 5) for _ in RATINGS] + [rng.choice(QUOTED_COMMENTS)])
+    return path
+
+
+def run_reader(name, csv_file):
+    import analysis
+
+    reader = getattr(analysis, name)
+    start = time.perf_counter()
+    for store, comments, fraction in reader(csv_file):
+        pass
+    seconds = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+    print(f"{seconds} {peak_mb} {store.rows}")
+
+
+def main(size_mb, csv_file):
+    rows = size_mb * 2**20 // ROW_BYTES
+    quoted_file = os.path.splitext(csv_file)[0] + '.quoted.csv'
+    for path, write in ((csv_file, write_survey), (quoted_file, write_quoted_survey)):
+        if not os.path.exists(path):
+            print(f"writing {rows} rows to {path} ...")
+            write(path, rows)
+
+    print(f"{'comments':>8} {'reader':>18} {'seconds':>10} {'MB/s':>8} {'peak RSS MB':>12}")
+    for label, path in (('plain', csv_file), ('quoted', quoted_file)):
+        bench_file(label, path)
+
+
+def bench_file(label, csv_file):
+    size = os.path.getsize(csv_file) / 2**20
+    for name in ('read_chunks', 'read_chunks_mmap'):
+        output = subprocess.run(
+            [sys.executable, __file__, '--run', name, csv_file],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        seconds, peak_mb = float(output[0]), float(output[1])
+        print(f"{label:>8} {name:>18} {seconds:>10.2f} {size / seconds:>8.1f} {peak_mb:>12.1f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--run']:
+        run_reader(sys.argv[2], sys.argv[3])
+    else:
+        size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+        if len(sys.argv) > 2:
+            main(size_mb, sys.argv[2])
+        else:
+            with tempfile.TemporaryDirectory() as tmp:
+                main(size_mb, os.path.join(tmp, 'survey.csv'))
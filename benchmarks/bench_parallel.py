@@ -0,0 +1,65 @@
+"""
+Scaling of a whole analyze_csv run over 1..N sentiment worker processes.
+
+The comments are nearly all different and every run starts with an
+empty sentiment cache, so they all go through the model, chunk by chunk
+as the app does it. Pool start-up and model loading are done before
+timing, so the numbers are steady-state throughput of the file, with
+the reading and counting that overlap the prediction included.
+
+    python benchmarks/bench_parallel.py [rows] [max workers]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from analysis import analyze_csv
+from sentiment import PARALLEL_MIN_COMMENTS, SentimentModel
+from sentiment_cache import SentimentCache
+from synthetic import COMMENTS, METADATA, RATINGS, make_comments
+
+
+def write_distinct_survey(path, rows):
+    """A survey whose comments are nearly all different, so the cache does not hide the model."""
+    rng = random.Random(0)
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(METADATA + RATINGS + [COMMENTS])
+        for i, comment in enumerate(make_comments(rows)):
+            writer.writerow(["2024/01/01 8:00:00", f"student{i}@ccc.edu.ph", f"Student {i}", "BSCS"]
+                            + [rng.randint(1, 5) for _ in RATINGS] + [comment])
+    return path
+
+
+def main(rows, max_workers):
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>10} {'rows/s':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        csv_file = write_distinct_survey(os.path.join(directory, 'survey.csv'), rows)
+        for workers in range(1, max_workers + 1):
+            model = SentimentModel(workers=workers)
+            model.predict(make_comments(PARALLEL_MIN_COMMENTS, seed=1))
+            cache = SentimentCache(os.path.join(directory, f'cache{workers}'))
+            try:
+                start = time.perf_counter()
+                result = analyze_csv(csv_file, model, cache)
+                seconds = time.perf_counter() - start
+            finally:
+                cache.close()
+                model.close()
+
+            sentiments = result["summary"].sentiments
+            if baseline is None:
+                baseline = (seconds, sentiments)
+            assert sentiments == baseline[1]
+            print(f"{workers:>8} {seconds:>10.3f} {rows / seconds:>12.0f} {baseline[0] / seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 200_000, args[1] if len(args) > 1 else os.cpu_count())
@@ -0,0 +1,35 @@
+"""
+Sentiment throughput (comments/sec) of SentimentModel.predict at several
+batch sizes. A batch size of 1 is the old one-comment-at-a-time loop.
+
+    python benchmarks/bench_sentiment.py [comments] [batch sizes ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from sentiment import SentimentModel
+from synthetic import make_comments
+
+
+def main(count, batch_sizes):
+    model = SentimentModel()
+    start = time.perf_counter()
+    model.load()
+    print(f"model load: {time.perf_counter() - start:.3f}s")
+
+    comments = make_comments(count)
+    print(f"{'batch':>8} {'seconds':>10} {'comments/s':>12}")
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        for i in range(0, count, batch_size):
+            model.predict(comments[i:i + batch_size])
+        seconds = time.perf_counter() - start
+        print(f"{batch_size:>8} {seconds:>10.3f} {count / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 20_000, args[1:] or [1, 10, 100, 1000, 10_000])
@@ -0,0 +1,44 @@
+"""
+Cold-start timings of the app: imports done, MainApp.build done and first
+frame flipped, in seconds since main.py started, plus the wall time of the
+whole process. Needs a display (or a virtual one such as Xvfb).
+
+    python benchmarks/bench_startup.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+
+def run_once():
+    env = dict(os.environ, STARTUP_BENCHMARK='1', KIVY_NO_ARGS='1')
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, 'main.py'], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    wall = time.perf_counter() - start
+
+    for line in output.splitlines():
+        if line.startswith("STARTUP "):
+            timings = json.loads(line[len("STARTUP "):])
+            timings["process"] = wall
+            return timings
+    raise RuntimeError("main.py did not report its startup timings")
+
+
+def main(runs):
+    results = [run_once() for _ in range(runs)]
+    print(f"{'stage':>12} {'median s':>10} {'min s':>10}")
+    for stage in ("imports", "build", "first_frame", "process"):
+        values = [result[stage] for result in results]
+        print(f"{stage:>12} {statistics.median(values):>10.3f} {min(values):>10.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
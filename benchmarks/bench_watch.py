@@ -0,0 +1,61 @@
+"""
+Cost of picking up newly appended responses in watch mode: a full
+analyze_csv of the grown file against SurveyTail.update, which only reads
+and classifies the appended rows, for files of growing size. The update
+time should stay flat while the full run grows with the file.
+
+    python benchmarks/bench_watch.py [appended rows, e.g. 50]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from analysis import analyze_csv
+from sentiment import SentimentModel
+from sentiment_cache import SentimentCache
+from synthetic import write_survey
+from watch import SurveyTail
+
+FILE_ROWS = (10_000, 100_000, 400_000)
+
+
+def appended_rows(directory, count, seed):
+    """Body lines of a fresh synthetic survey, with comments unseen so far."""
+    path = write_survey(os.path.join(directory, 'new.csv'), count, seed=seed, comment_words=12)
+    with open(path, 'rb') as f:
+        f.readline()
+        return f.read()
+
+
+def main(appended):
+    model = SentimentModel(workers=1)
+    model.load()
+    print(f"{'file rows':>10} {'full s':>9} {'update s':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SentimentCache(os.path.join(directory, 'cache'))
+        for rows in FILE_ROWS:
+            csv_file = write_survey(os.path.join(directory, 'live.csv'), rows, seed=0)
+            tail = SurveyTail(csv_file)
+            tail.update(model, cache)
+
+            with open(csv_file, 'ab') as f:
+                f.write(appended_rows(directory, appended, seed=rows))
+            start = time.perf_counter()
+            result = tail.update(model, cache)
+            update_seconds = time.perf_counter() - start
+            assert result["new_rows"] == appended
+
+            start = time.perf_counter()
+            full = analyze_csv(csv_file, model, cache)
+            full_seconds = time.perf_counter() - start
+            assert full["summary"].to_dict() == result["summary"].to_dict()
+            print(f"{rows:>10} {full_seconds:>9.3f} {update_seconds:>9.4f}")
+        cache.close()
+    model.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
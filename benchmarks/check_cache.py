@@ -0,0 +1,110 @@
+"""
+Regression check of SentimentCache persistence against a plain dict:
+random puts (new comments, relabelled ones, case and spacing variants of
+the same comment), flushes, background and waited compactions, reopening,
+a torn record at the end of the log and read-only caches handing their
+entries over with take_pending/put_records. After every step each
+comment must read back its last label, and after every compaction the
+.idx file must be well formed: magic, count, strictly increasing keys
+and one label code per key. Exits with 1 on the first difference.
+
+    python benchmarks/check_cache.py [steps, e.g. 300] [seed]
+"""
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import sentiment_cache
+from sentiment_cache import (HEADER_SIZE, INDEX_MAGIC, LABELS, RECORD_SIZE, SentimentCache, comment_key,
+                             normalize_comment)
+
+
+def variant(rng, comment):
+    """The same comment as far as the cache is concerned: other case and spacing."""
+    words = [word.upper() if rng.random() < 0.3 else word for word in comment.split()]
+    return rng.choice(['', ' ']) + rng.choice([' ', '  ', '\t']).join(words)
+
+
+def check_index(path):
+    """Problem found in the .idx file, or None."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:8] != INDEX_MAGIC:
+        return "bad magic"
+    count = int.from_bytes(data[8:HEADER_SIZE], 'little')
+    if len(data) != HEADER_SIZE + count * 9:
+        return f"size {len(data)} for {count} entries"
+    keys = [int.from_bytes(data[HEADER_SIZE + i * 8:HEADER_SIZE + i * 8 + 8], 'little') for i in range(count)]
+    if any(a >= b for a, b in zip(keys, keys[1:])):
+        return "keys not strictly increasing"
+    if any(code >= len(LABELS) for code in data[HEADER_SIZE + count * 8:]):
+        return "unknown label code"
+    return None
+
+
+def main(steps, seed):
+    rng = random.Random(seed)
+    # SMALL THRESHOLDS, SO COMPACTIONS AND THE BACKPRESSURE WAIT HAPPEN OFTEN
+    sentiment_cache.COMPACT_MIN_RECORDS = 16
+    sentiment_cache.COMPACT_MAX_RECORDS = 64
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cache')
+        cache = SentimentCache(path, memory_size=rng.choice([0, 8, 1000]))
+        expected = {}
+        comments = {}
+
+        for step in range(steps):
+            action = rng.random()
+            if action < 0.6:
+                for _ in range(rng.randint(1, 40)):
+                    number = rng.randint(0, 500)
+                    comment = variant(rng, f"comment number {number} was fine")
+                    label = rng.choice(LABELS)
+                    expected[normalize_comment(comment)] = label
+                    comments[normalize_comment(comment)] = comment
+                    cache.put(comment, label)
+                cache.flush()
+            elif action < 0.7:
+                cache.compact(wait=True)
+                problem = check_index(cache.index_file) if os.path.exists(cache.index_file) else None
+                if problem:
+                    print(f"step {step}: {cache.index_file}: {problem}")
+                    return 1
+            elif action < 0.8:
+                cache.close()
+                if rng.random() < 0.5 and os.path.exists(cache.log_file):
+                    # A CRASH IN THE MIDDLE OF AN APPEND LEAVES PART OF A RECORD
+                    with open(cache.log_file, 'ab') as f:
+                        f.write(os.urandom(rng.randint(1, RECORD_SIZE - 1)))
+                cache = SentimentCache(path, memory_size=rng.choice([0, 8, 1000]))
+            else:
+                cache.flush()
+                reader = SentimentCache(path, read_only=True)
+                comment = f"read only comment {step}"
+                label = rng.choice(LABELS)
+                reader.put(comment, label)
+                cache.put_records(reader.take_pending())
+                cache.flush()
+                reader.close()
+                expected[normalize_comment(comment)] = label
+                comments[normalize_comment(comment)] = comment
+
+            for normalized, label in expected.items():
+                found = cache.get(variant(rng, comments[normalized]))
+                if found != label:
+                    print(f"step {step}: {comments[normalized]!r} (key {comment_key(normalized)}) "
+                          f"is {found}, expected {label}")
+                    return 1
+        cache.close()
+
+    print(f"{steps} steps, {len(expected)} comments, every label read back")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 300,
+                  int(sys.argv[2]) if len(sys.argv) > 2 else 0))
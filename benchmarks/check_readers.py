@@ -0,0 +1,78 @@
+"""
+Regression check of read_chunks_mmap against read_chunks on randomized
+small surveys: quoted fields with commas, doubled quotes and line
+breaks, CRLF endings, blank, short and long rows, non-ASCII text, values
+that are not 1-5 stars and files with or without a final line break.
+Half the files have no blank or short rows, so most of their blocks are
+parsed by the record expression rather than the csv fallback.
+Blocks are kept tiny so every file is cut into many of them. Both readers
+must give the same row count, star columns and comments; exits with 1 on
+the first file where they differ and prints it.
+
+    python benchmarks/check_readers.py [files, e.g. 2000] [seed]
+"""
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import analysis
+from analysis import read_chunks, read_chunks_mmap
+from synthetic import COMMENTS, METADATA, rating_header
+
+HEADER = METADATA + rating_header(3) + [COMMENTS]
+VALUES = ['1', '2', '3', '4', '5', '', ' 3', 'x', '10', '"a,b"', '"multi\nline"', '"q""uote"', '"5"',
+          'hello world', 'ü', 'N/A']
+CHUNK_ROWS = 7
+
+
+def write_random_survey(path, rng):
+    lines = [','.join(HEADER)]
+    # HALF THE FILES HAVE ONLY WHOLE ROWS, SO MOST OF THEIR BLOCKS TAKE THE FAST PATH
+    ragged = rng.random() < 0.5
+    for _ in range(rng.randint(0, 60)):
+        if ragged and rng.random() < 0.05:
+            lines.append('')
+            continue
+        fields = rng.choice([len(HEADER), len(HEADER), len(HEADER) - 1, 3, len(HEADER) + 1] if ragged
+                            else [len(HEADER), len(HEADER) + 1])
+        lines.append(','.join(rng.choice(VALUES) for _ in range(fields)))
+    newline = rng.choice(['\n', '\r\n'])
+    text = newline.join(lines) + (newline if rng.random() < 0.7 else '')
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+
+
+def read_all(reader, path):
+    comments = []
+    for store, chunk_comments, fraction in reader(path, CHUNK_ROWS):
+        if chunk_comments is not None:
+            comments.extend(chunk_comments)
+    return store.rows, [bytes(column) for column in store.columns.values()], comments
+
+
+def main(files, seed):
+    rng = random.Random(seed)
+    # TINY BLOCKS, SO BLOCK BOUNDARIES FALL INSIDE QUOTES AND CRLF PAIRS
+    analysis.MMAP_BLOCK = 64
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'survey.csv')
+        for number in range(files):
+            write_random_survey(path, rng)
+            expected = read_all(read_chunks, path)
+            actual = read_all(read_chunks_mmap, path)
+            if actual != expected:
+                with open(path, 'rb') as f:
+                    print(f"file {number} differs:\n{f.read()!r}")
+                print(f"read_chunks:      {expected}")
+                print(f"read_chunks_mmap: {actual}")
+                return 1
+    print(f"{files} files, same rows, stars and comments")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+                  int(sys.argv[2]) if len(sys.argv) > 2 else 0))
@@ -0,0 +1,217 @@
+"""
+Headless benchmark suite: ingestion, aggregation, sentiment prediction and
+sentiment cache persistence, on synthetic surveys whose rows, rating
+columns, comment columns and comment length are scaled one at a time.
+Inputs come from fixed seeds, every case keeps the best of --repeat runs,
+and the results are saved as JSON so a later run can be compared against
+them.
+
+    python benchmarks/suite.py [--quick] [--only ingest,cache] [--repeat 3]
+                               [--output results.json] [--compare baseline.json]
+
+--compare prints the time ratio of every case also in the baseline and
+exits with 1 when one is slower by more than --tolerance (default 10%).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from analysis import SurveySummary, ingest_csv, read_chunks_mmap
+from sentiment import SentimentModel
+from sentiment_cache import LABELS, SentimentCache
+from synthetic import RATINGS, make_comments, write_survey
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+GROUPS = ('ingest', 'aggregate', 'sentiment', 'cache')
+
+# EACH VARIANT CHANGES ONE DIMENSION OF THE BASE SURVEY
+BASE_SURVEY = {'rows': 50_000, 'ratings': len(RATINGS), 'comment_columns': 1, 'comment_words': 10}
+VARIANTS = {
+    'base': {},
+    'rows_x4': {'rows': 200_000},
+    'ratings_x4': {'ratings': 4 * len(RATINGS)},
+    'comment_columns_x4': {'comment_columns': 4},
+    'comment_words_x8': {'comment_words': 80},
+}
+SENTIMENT_COMMENTS = 5_000
+SENTIMENT_WORDS = (10, 80)
+CACHE_ENTRIES = 200_000
+MERGED_SUMMARIES = 50
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    return time.perf_counter() - start, value
+
+
+# CASES: EACH RETURNS A DICT WITH AT LEAST "seconds"
+def ingest_case(csv_file):
+    seconds, (store, comments) = timed(ingest_csv, csv_file)
+    size = os.path.getsize(csv_file) / 2**20
+    return {"seconds": seconds, "rows_per_s": store.rows / seconds, "mb_per_s": size / seconds}
+
+
+def ingest_mmap_case(csv_file):
+    def read():
+        for store, comments, fraction in read_chunks_mmap(csv_file):
+            pass
+        return store
+    seconds, store = timed(read)
+    size = os.path.getsize(csv_file) / 2**20
+    return {"seconds": seconds, "rows_per_s": store.rows / seconds, "mb_per_s": size / seconds}
+
+
+def aggregate_case(store):
+    sentiments = {'Positive': 3, 'Neutral': 2, 'Negative': 1}
+    summary_seconds, summary = timed(lambda: SurveySummary.from_store(store, sentiments, ['survey.csv']))
+    index_seconds, index = timed(summary.summary_index)
+    records = [SurveySummary.from_dict(summary.to_dict()) for _ in range(MERGED_SUMMARIES)]
+    merge_seconds, combined = timed(SurveySummary.combine, records)
+    return {
+        "seconds": summary_seconds + index_seconds + merge_seconds,
+        "summary_s": summary_seconds,
+        "summary_index_s": index_seconds,
+        "merge_s": merge_seconds,
+    }
+
+
+def sentiment_case(model, comments):
+    seconds, labels = timed(model.predict, comments)
+    return {"seconds": seconds, "comments_per_s": len(comments) / seconds}
+
+
+def cache_case(directory, entries):
+    path = os.path.join(directory, 'cache')
+    for extension in ('.idx', '.log'):
+        if os.path.exists(path + extension):
+            os.remove(path + extension)
+    comments = [f"comment number {i}" for i in range(entries)]
+
+    cache = SentimentCache(path)
+    write_seconds, _ = timed(lambda: (cache.update((c, LABELS[i % 3]) for i, c in enumerate(comments)), cache.flush()))
+    compact_seconds, _ = timed(cache.compact, True)
+    cache.close()
+
+    cache = SentimentCache(path, memory_size=0)
+    open_seconds, _ = timed(cache.open)
+    lookup_seconds, hits = timed(lambda: sum(cache.get(c) is not None for c in comments))
+    cache.close()
+    assert hits == entries
+    return {
+        "seconds": write_seconds + compact_seconds + open_seconds + lookup_seconds,
+        "write_s": write_seconds,
+        "compact_s": compact_seconds,
+        "open_s": open_seconds,
+        "lookup_s": lookup_seconds,
+    }
+
+
+def best_of(repeat, case, *args):
+    return min((case(*args) for _ in range(repeat)), key=lambda result: result["seconds"])
+
+
+def run_suite(groups, repeat, quick, directory):
+    scale = 10 if quick else 1
+    results = {}
+
+    def record(name, result):
+        results[name] = result
+        print(f"{name:<40} {result['seconds']:>9.3f} s")
+
+    if 'ingest' in groups or 'aggregate' in groups:
+        for variant, changes in VARIANTS.items():
+            survey = dict(BASE_SURVEY, **changes)
+            survey['rows'] //= scale
+            csv_file = write_survey(os.path.join(directory, f"{variant}.csv"), seed=0, **survey)
+            if 'ingest' in groups:
+                record(f"ingest/{variant}", best_of(repeat, ingest_case, csv_file))
+                record(f"ingest_mmap/{variant}", best_of(repeat, ingest_mmap_case, csv_file))
+            if 'aggregate' in groups:
+                store, comments = ingest_csv(csv_file)
+                record(f"aggregate/{variant}", best_of(repeat, aggregate_case, store))
+            os.remove(csv_file)
+
+    if 'sentiment' in groups:
+        model = SentimentModel(workers=1)
+        seconds, _ = timed(model.load)
+        record("sentiment/load", {"seconds": seconds})
+        for words in SENTIMENT_WORDS:
+            comments = make_comments(SENTIMENT_COMMENTS // scale, seed=1, words=words)
+            record(f"sentiment/words_{words}", best_of(repeat, sentiment_case, model, comments))
+        model.close()
+
+    if 'cache' in groups:
+        entries = CACHE_ENTRIES // scale
+        record(f"cache/{entries}", best_of(repeat, cache_case, directory, entries))
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Prints new/old time ratios; returns the names of the regressed cases."""
+    regressions = []
+    print(f"\n{'case':<40} {'baseline s':>10} {'now s':>9} {'ratio':>7}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["seconds"], result["seconds"]
+        ratio = new / old if old else float('inf')
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<40} {old:>10.3f} {new:>9.3f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument('--quick', action='store_true', help="a tenth of the rows, comments and cache entries")
+    parser.add_argument('--only', help=f"comma-separated groups out of {', '.join(GROUPS)}")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per case, the fastest is kept")
+    parser.add_argument('--output', help="results file (default benchmarks/results/<time>.json)")
+    parser.add_argument('--compare', help="results file of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="allowed slowdown before a regression")
+    args = parser.parse_args(argv)
+
+    groups = args.only.split(',') if args.only else list(GROUPS)
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = run_suite(groups, args.repeat, args.quick, directory)
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime('%Y%m%d-%H%M%S') + '.json')
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "device": platform.platform(),
+            "python": platform.python_version(),
+            "quick": args.quick,
+            "repeat": args.repeat,
+            "cases": results,
+        }, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("quick") != args.quick:
+            print("Warning: comparing a --quick run with a full one.")
+        if compare(results, baseline["cases"], args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import csv
+import random
+
+METADATA = ["Timestamp", "Email Address", "Name", "Course"]
+RATINGS = [
+    "1. The activity was well coordinated",
+    "2. Participants gathered on time",
+    "3. The objectives of the event were met",
+    "4. The goals were clearly explained",
+    "5. The discussions were engaging",
+    "6. Participation of the audience was encouraged",
+    "7. Accessibility of the venue",
+    "8. Comfort of the venue",
+]
+COMMENTS = "Comments / Suggestions"
+SAMPLE_COMMENTS = [
+    "N/A", "n/a", "Goodluck", "none", "-",
+    "Very knowledgeable",
+    "The event was well organized and the speakers were great.",
+    "The venue was too hot and the program started late.",
+    "I learned a lot about my responsibilities as an officer.",
+]
+
+
+def rating_header(count):
+    """count rating questions; past the eight real ones they repeat with a number."""
+    header = []
+    for i in range(count):
+        question = RATINGS[i % len(RATINGS)]
+        if i >= len(RATINGS):
+            question = f"{i + 1}. {question.split('. ', 1)[1]} ({i // len(RATINGS) + 1})"
+        header.append(question)
+    return header
+
+
+def comment_header(count):
+    """The comment column first, then more free-text columns of the Feedback category."""
+    return [COMMENTS] + [f"Other suggestions {i + 1}" for i in range(count - 1)]
+
+
+def make_comments(count, seed=0, words=None):
+    """count comments of 1-30 (or exactly words) words drawn from SAMPLE_COMMENTS."""
+    rng = random.Random(seed)
+    vocabulary = " ".join(SAMPLE_COMMENTS).split()
+    return [" ".join(rng.choices(vocabulary, k=words or rng.randint(1, 30))) for _ in range(count)]
+
+
+def write_survey(path, rows, seed=0, ratings=len(RATINGS), comment_columns=1, comment_words=None):
+    """
+    Writes a synthetic survey export laid out like the real forms: the four
+    metadata columns, ratings rating columns and comment_columns free-text
+    columns. Comments are the SAMPLE_COMMENTS, or with comment_words random
+    comments of that many words, so rows, columns and comment length scale
+    independently.
+    """
+    rng = random.Random(seed)
+    if comment_words:
+        pool = make_comments(1000, seed, comment_words)
+    else:
+        pool = SAMPLE_COMMENTS
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(METADATA + rating_header(ratings) + comment_header(comment_columns))
+        for i in range(rows):
+            writer.writerow(
+                ["2024/01/01 8:00:00", f"student{i}@ccc.edu.ph", f"Student {i}", "BSCS"]
+                + [rng.randint(1, 5) for _ in range(ratings)]
+                + [rng.choice(pool) for _ in range(comment_columns)]
+            )
+    return path
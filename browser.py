@@ -0,0 +1,127 @@
+import csv
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from analysis import RatingStore
+from categories import default_rules
+
+STATE_FILE = 'browser_state.json'
+MAX_RECENT = 8
+MAX_LISTINGS = 64
+
+
+def default_folder():
+    """Shared storage on Android, the home folder elsewhere."""
+    for path in (os.environ.get('EXTERNAL_STORAGE'), '/storage/emulated/0', os.path.expanduser('~')):
+        if path and os.path.isdir(path):
+            return path
+    return os.getcwd()
+
+
+class DirectoryCache:
+    """
+    Listings of folders: their subfolders and CSV files, hidden ones left
+    out, folders first. A listing is reused while the folder's mtime stays
+    the same, so going back to a folder costs one stat instead of a scan,
+    and cached() returns the last listing without touching the disk at all.
+    At most max_listings folders are kept, least recently used first out.
+    """
+
+    def __init__(self, max_listings=MAX_LISTINGS):
+        self.max_listings = max_listings
+        self._lock = threading.Lock()
+        self._listings = OrderedDict()
+
+    def cached(self, path):
+        with self._lock:
+            listing = self._listings.get(path)
+            return None if listing is None else listing[1]
+
+    def list(self, path):
+        """(name, path, is_dir) entries of a folder; raises OSError."""
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            listing = self._listings.get(path)
+            if listing is not None and listing[0] == mtime:
+                self._listings.move_to_end(path)
+                return listing[1]
+
+        folders, files = [], []
+        with os.scandir(path) as scan:
+            for entry in scan:
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    if entry.is_dir():
+                        folders.append((entry.name, entry.path, True))
+                    elif entry.name.lower().endswith('.csv'):
+                        files.append((entry.name, entry.path, False))
+                except OSError:
+                    continue
+        entries = sorted(folders, key=lambda e: e[0].casefold()) + sorted(files, key=lambda e: e[0].casefold())
+
+        with self._lock:
+            self._listings[path] = (mtime, entries)
+            self._listings.move_to_end(path)
+            while len(self._listings) > self.max_listings:
+                self._listings.popitem(last=False)
+        return entries
+
+
+class BrowserState:
+    """Last folder browsed and most recently used CSV files, kept in a JSON file."""
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self.last_folder = None
+        self.recent = []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.last_folder = state.get('last_folder')
+            self.recent = list(state.get('recent', []))[:MAX_RECENT]
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def start_folder(self):
+        if self.last_folder and os.path.isdir(self.last_folder):
+            return self.last_folder
+        return default_folder()
+
+    def remember(self, csv_file):
+        """Moves a file to the top of the recent list and its folder becomes the last one."""
+        csv_file = os.path.abspath(csv_file)
+        self.recent = [csv_file] + [path for path in self.recent if path != csv_file][:MAX_RECENT - 1]
+        self.last_folder = os.path.dirname(csv_file)
+        self.save()
+
+    def save(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'last_folder': self.last_folder, 'recent': self.recent}, f)
+        except OSError as e:
+            print(f"Warning: could not save {self.path}: {e}")
+
+
+def check_header(csv_file, rules=None):
+    """
+    Reads only the header of a CSV file; returns (usable, message). A file
+    is usable when it has rating columns or a comment column.
+    """
+    rules = rules or default_rules()
+    try:
+        with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+            header = next(csv.reader(f), [])
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        return False, f"Cannot read the file: {e}"
+    if not header:
+        return False, "The file is empty."
+
+    ratings = len(RatingStore(header, rules).columns)
+    comment_index = rules.find_comment_column(header)
+    if not ratings and comment_index is None:
+        return False, "No rating or comment columns found."
+    comment = f"comments: {header[comment_index]}" if comment_index is not None else "no comment column"
+    return True, f"{ratings} rating columns, {comment}"
@@ -23,7 +23,7 @@ source.include_exts = py,png,jpg,kv,atlas,ttf,mp3,json,joblib,csv,json
 # source.exclude_exts = spec
 
 # (list) List of directory to exclude (let empty to not exclude anything)
-source.exclude_dirs = tests, bin, venv, buildozer, .github
+source.exclude_dirs = tests, bin, venv, buildozer, .github, benchmarks
 
 # (list) List of exclusions using pattern matching
 # Do not prefix with './'
@@ -38,7 +38,7 @@ version = 1.0.0
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy
+requirements = python3,kivy,numpy,scipy,scikit-learn,joblib,threadpoolctl
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
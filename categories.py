@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'category_rules.json')
+
+# DIFFERENT SURVEY TEMPLATES REMEMBERED PER RULE TABLE
+HEADER_CACHE_SIZE = 64
+IGNORED = -1
+
+
+# TRANSFORM
+def simplify_text(text):
+    """Simplifies text by removing numbers, punctuation, and stopwords."""
+    return text.lower().replace(" ", "").strip()
+
+
+class CategoryRules:
+    """
+    Column categorization driven by a rule table (see category_rules.json).
+
+    A column belongs to the first category, in table order, that has one of
+    its keywords in the simplified column name; columns matching an
+    "ignore" keyword are left out and anything else goes to the default
+    category. All keywords are compiled into a single regex that reports
+    every (possibly overlapping) keyword occurrence in one scan, and the
+    categorization of a whole header is cached per header, so files of an
+    already seen template skip it entirely.
+    """
+
+    def __init__(self, table):
+        # IDENTIFIES THE TABLE, E.G. FOR CACHED RESULTS THAT DEPEND ON IT
+        self.signature = hashlib.blake2b(json.dumps(table, sort_keys=True).encode('utf-8'), digest_size=8).hexdigest()
+        self.metadata_columns = table.get('metadata_columns', 4)
+        self.default_category = table.get('default_category', 'Other')
+        self.comment_columns = table.get('comment_columns', ['comment', 'comments', 'review', 'text'])
+        self.categories = [rule['name'] for rule in table['categories']]
+        self.text_categories = {rule['name'] for rule in table['categories'] if rule.get('text')}
+
+        self._priority = {}
+        for keyword in table.get('ignore', []):
+            self._priority.setdefault(simplify_text(keyword), IGNORED)
+        for priority, rule in enumerate(table['categories']):
+            for keyword in rule['keywords']:
+                self._priority.setdefault(simplify_text(keyword), priority)
+
+        # Alternatives in priority order, so at any position the keyword of
+        # the earliest category wins.
+        keywords = sorted(self._priority, key=self._priority.get)
+        self._matcher = re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))') if keywords else None
+        self._categorize = lru_cache(maxsize=HEADER_CACHE_SIZE)(self._categorize_header)
+
+    @classmethod
+    def load(cls, path=RULES_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def category_of(self, col_name):
+        """Category of one column, or None when it is ignored."""
+        best = None
+        if self._matcher is not None:
+            for match in self._matcher.finditer(simplify_text(col_name)):
+                priority = self._priority[match.group(1)]
+                if best is None or priority < best:
+                    best = priority
+        if best is None:
+            return self.default_category
+        if best == IGNORED:
+            return None
+        return self.categories[best]
+
+    def categorize(self, header):
+        """Category -> column names of a header. The result is shared; do not modify it."""
+        return self._categorize(tuple(header))
+
+    def _categorize_header(self, header):
+        category_map = {}
+        for col_name in header[self.metadata_columns:]:
+            category = self.category_of(col_name)
+            if category is not None:
+                category_map.setdefault(category, []).append(col_name)
+        return category_map
+
+    def find_comment_column(self, header):
+        """Index of the column holding the free-text comments, or None."""
+        for col in self.comment_columns:
+            for index, key in enumerate(header):
+                if col in key.lower():
+                    return index
+        return None
+
+
+_default_rules = None
+
+
+def default_rules():
+    """Rules from $CATEGORY_RULES or category_rules.json, loaded once."""
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = CategoryRules.load(os.environ.get('CATEGORY_RULES', RULES_FILE))
+    return _default_rules
+
+
+# CATEGORIZE
+def categorize_columns(header, rules=None):
+    """Smart categorization of columns into categories."""
+    return (rules or default_rules()).categorize(header)
+
+
+def find_comment_column(header, rules=None):
+    return (rules or default_rules()).find_comment_column(header)
@@ -0,0 +1,96 @@
+from kivy.animation import Animation
+from kivy.graphics import Color, Ellipse, RoundedRectangle
+
+ANIMATION_DURATION = 0.5
+
+
+class BarChart:
+    """
+    Horizontal percentage bar on top of a widget's own background.
+
+    The Color and RoundedRectangle are created once in the widget's
+    canvas.before. set_percent animates the width of that same rectangle
+    from wherever it currently is, cancelling an animation still running,
+    so paging quickly never piles up instructions or animations.
+    """
+
+    def __init__(self, widget, color):
+        self.widget = widget
+        self.percent = 0
+        with widget.canvas.before:
+            self.color = Color(*color)
+            self.bar = RoundedRectangle(pos=widget.pos, size=(0, widget.height))
+        widget.bind(pos=self._layout, size=self._layout)
+
+    def _size(self):
+        return self.widget.width * self.percent / 100, self.widget.height
+
+    def _layout(self, *args):
+        Animation.cancel_all(self.bar)
+        self.bar.pos = self.widget.pos
+        self.bar.size = self._size()
+
+    def set_percent(self, percent):
+        self.percent = percent
+        Animation.cancel_all(self.bar)
+        Animation(size=self._size(), duration=ANIMATION_DURATION).start(self.bar)
+
+
+class PieChart:
+    """
+    Donut chart of a few values, drawn in a widget's canvas.
+
+    One Ellipse segment per value plus the hole are created once;
+    set_values animates the angles of the existing segments to the new
+    shares. A total of 0 draws no segments.
+    """
+
+    def __init__(self, widget, colors, hole_color):
+        self.widget = widget
+        self.segments = []
+        self.shown = False
+        with widget.canvas:
+            for color in colors:
+                Color(*color)
+                self.segments.append(Ellipse(angle_start=0, angle_end=0))
+            Color(*hole_color)
+            self.hole = Ellipse(size=(0, 0))
+        widget.bind(pos=self._layout, size=self._layout)
+        self._layout()
+
+    # SAME PLACEMENT AS THE ORIGINAL CHART: OFFSET FROM THE PARENT'S MIDDLE
+    def _origin(self):
+        widget = self.widget
+        parent_width = widget.parent.width if widget.parent is not None else widget.width
+        return widget.x + parent_width / 2 - 60, widget.y - 40
+
+    def _hole_geometry(self):
+        x, y = self._origin()
+        width, height = self.widget.size
+        return (x + width / 4, y + height / 4), (width / 2, height / 2)
+
+    def _layout(self, *args):
+        origin = self._origin()
+        for segment in self.segments:
+            segment.pos = origin
+            segment.size = self.widget.size
+        if self.shown:
+            Animation.cancel_all(self.hole)
+            self.hole.pos, self.hole.size = self._hole_geometry()
+
+    def set_values(self, values):
+        total = sum(values)
+        start = 0
+        for segment, value in zip(self.segments, values):
+            end = start + (360 * value / total if total else 0)
+            Animation.cancel_all(segment)
+            Animation(angle_start=start, angle_end=end, duration=ANIMATION_DURATION).start(segment)
+            start = end
+
+        # The hole grows out of the middle the first time only.
+        if not self.shown:
+            self.shown = True
+            pos, size = self._hole_geometry()
+            self.hole.pos = (pos[0] + size[0] / 2, pos[1] + size[1] / 2)
+            self.hole.size = (1, 1)
+            Animation(pos=pos, size=size, duration=ANIMATION_DURATION).start(self.hole)
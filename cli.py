@@ -0,0 +1,256 @@
+"""
+Headless batch analysis of survey CSV exports, without Kivy.
+
+    python cli.py exports/ extra.csv --output summaries --jobs 4
+    python cli.py summaries/*.json --rollup semester.json
+
+Folders are expanded to the .csv files they contain. Every CSV gets a
+mergeable summary record (<name>.json, plus <name>.csv with --csv) in the
+output folder, and summary.csv lists the sentiment counts of all inputs.
+Inputs ending in .json are summary records written by an earlier run;
+they are loaded instead of re-analyzed, so --rollup over them only merges
+counts. Files are analyzed concurrently in --jobs processes; their new
+predictions are written to the sentiment cache by this process only.
+
+With --annotate csv|jsonl, every row of each CSV is also streamed to
+<name>.annotated.csv|jsonl with its predicted sentiment as it is
+classified. Such files are always read, even when the result cache has
+their summary. A file whose annotated copy cannot be written still gets
+its summary, with the error in summary.csv and an exit status of 1.
+
+When the sentiment model cannot run, a file still gets its star counts,
+but its row in summary.csv carries the error, the exit status is 1 and
+its summary is not put in the result cache.
+
+With --profile LOG, one record per analyzed file (stage times, counts,
+cache hit ratios, peak memory; see profiling.py) is appended to LOG.
+"""
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from analysis import AnalysisError, SurveySummary, analyze_csv
+from categories import default_rules
+from export import FORMATS, AnnotatedWriter
+from profiling import NULL_PROFILE, RunProfile, append_record
+from result_cache import RESULT_CACHE_DIR, ResultCache, content_digest
+from sentiment import SentimentModel
+from sentiment_cache import CACHE_FILE, SentimentCache
+
+INDEX_FIELDS = ['file', 'rows', 'positive', 'neutral', 'negative', 'error']
+
+
+def find_inputs(paths):
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            inputs.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith('.csv')
+            ))
+        else:
+            inputs.append(path)
+    return inputs
+
+
+def write_table(summary, path):
+    """One row per subcategory with its star counts and verdict."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['category', 'subcategory', 'star_1', 'star_2', 'star_3', 'star_4', 'star_5',
+                         'weighted_average', 'result_text'])
+        for category, subcategories in summary.summary_index():
+            for item in subcategories:
+                writer.writerow([category, item["subcategory"], *item["stars"],
+                                 f"{item['weighted_average']:.2f}", item["result_text"]])
+
+
+def output_name(output_dir, path, used):
+    name = os.path.splitext(os.path.basename(path))[0]
+    candidate, count = name, 1
+    while candidate in used:
+        count += 1
+        candidate = f"{name}_{count}"
+    used.add(candidate)
+    return os.path.join(output_dir, candidate)
+
+
+# STATE OF A WORKER PROCESS, SET UP ONCE BY THE POOL INITIALIZER
+_model = None
+_cache = None
+
+
+def _init_worker(cache_path):
+    global _model, _cache
+    _model = SentimentModel(workers=1)
+    _cache = SentimentCache(cache_path, read_only=True)
+
+
+def analyze_file(csv_file, model, cache, annotate_file=None, profile=NULL_PROFILE, digest=None):
+    """analyze_csv, streaming the annotated rows to annotate_file if given."""
+    if annotate_file is None:
+        return analyze_csv(csv_file, model, cache, profile=profile, digest=digest)
+    with AnnotatedWriter(annotate_file) as export:
+        return analyze_csv(csv_file, model, cache, export=export, profile=profile, digest=digest)
+
+
+def _analyze_in_worker(csv_file, annotate_file, profiling):
+    profile = RunProfile(csv_file, _cache) if profiling else NULL_PROFILE
+    digest = content_digest()
+    result = analyze_file(csv_file, _model, _cache, annotate_file, profile, digest)
+    record = profile.finish(worker=os.getpid()) if profiling else None
+    errors = result.get("sentiment_error"), result.get("export_error")
+    return result["summary"], errors, digest.hexdigest(), _cache.take_pending(), record
+
+
+def run(inputs, output_dir, jobs=1, cache_path=CACHE_FILE, tables=False, rollup=None,
+        result_cache_dir=RESULT_CACHE_DIR, annotate=None, profile_log=None):
+    """Analyzes the CSV inputs, loads the summary inputs and writes the outputs."""
+    os.makedirs(output_dir, exist_ok=True)
+    summaries = {}
+    errors = {}
+    warnings = {}
+    fingerprints = {}
+    used = set()
+    bases = {}
+    result_cache = ResultCache(result_cache_dir, context=default_rules().signature) if result_cache_dir else None
+
+    def annotate_file(path):
+        return f"{bases[path]}.annotated.{annotate}" if annotate else None
+
+    def finish(path, summary, sentiment_error=None, content_hash=None, export_error=None):
+        problems = [error for error in (sentiment_error, export_error) if error]
+        if problems:
+            warnings[path] = "; ".join(problems)
+        # A SUMMARY WITHOUT SENTIMENTS IS NOT CACHED, THE NEXT RUN TRIES THE MODEL AGAIN
+        if path in fingerprints and not sentiment_error:
+            try:
+                result_cache.store(path, fingerprints[path], content_hash, summary)
+            except OSError as e:
+                print(f"Warning: could not cache the result of {path}: {e}")
+        base = bases[path]
+        summary.save(base + '.json')
+        if tables:
+            write_table(summary, base + '.csv')
+        summaries[path] = summary
+        print(f"{path}: {summary.rows} rows")
+
+    csv_files = []
+    for path in inputs:
+        if path.lower().endswith('.json'):
+            try:
+                summaries[path] = SurveySummary.load(path)
+            except (OSError, ValueError, KeyError) as e:
+                errors[path] = f"Error reading the summary: {e}"
+            continue
+        bases[path] = output_name(output_dir, path, used)
+        if result_cache is not None:
+            try:
+                fingerprint = result_cache.fingerprint(path)
+                summary = None if annotate else result_cache.lookup(path, fingerprint)
+            except OSError as e:
+                errors[path] = f"Error reading the file: {e}"
+                continue
+            if summary is not None:
+                finish(path, summary)
+                continue
+            fingerprints[path] = fingerprint
+        csv_files.append(path)
+
+    cache = SentimentCache(cache_path)
+    cache.open()
+    try:
+        if jobs > 1 and len(csv_files) > 1:
+            with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(cache_path,)) as pool:
+                futures = {
+                    pool.submit(_analyze_in_worker, csv_file, annotate_file(csv_file), bool(profile_log)): csv_file
+                    for csv_file in csv_files
+                }
+                for future in as_completed(futures):
+                    try:
+                        summary, (sentiment_error, export_error), content_hash, records, record = future.result()
+                    except AnalysisError as e:
+                        errors[futures[future]] = str(e)
+                        continue
+                    cache.put_records(records)
+                    cache.flush()
+                    if profile_log:
+                        append_record(profile_log, record)
+                    finish(futures[future], summary, sentiment_error, content_hash, export_error)
+        else:
+            model = SentimentModel()
+            try:
+                for csv_file in csv_files:
+                    profile = RunProfile(csv_file, cache) if profile_log else NULL_PROFILE
+                    digest = content_digest()
+                    try:
+                        result = analyze_file(csv_file, model, cache, annotate_file(csv_file), profile, digest)
+                    except AnalysisError as e:
+                        errors[csv_file] = str(e)
+                        continue
+                    finish(csv_file, result["summary"], result.get("sentiment_error"), digest.hexdigest(),
+                           result.get("export_error"))
+                    if profile_log:
+                        profile.write(profile_log)
+            finally:
+                model.close()
+    finally:
+        cache.close()
+
+    rows = []
+    for path in inputs:
+        if path in errors:
+            print(f"{path}: {errors[path]}", file=sys.stderr)
+            rows.append({'file': path, 'error': errors[path]})
+            continue
+        summary = summaries[path]
+        rows.append({
+            'file': path,
+            'rows': summary.rows,
+            **{sentiment.lower(): count for sentiment, count in summary.sentiments.items()},
+            'error': warnings.get(path, ''),
+        })
+        if path in warnings:
+            print(f"{path}: {warnings[path]}", file=sys.stderr)
+    with open(os.path.join(output_dir, 'summary.csv'), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=INDEX_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    if rollup:
+        combined = SurveySummary.combine(summaries[path] for path in inputs if path in summaries)
+        combined.save(rollup)
+        if tables:
+            write_table(combined, os.path.splitext(rollup)[0] + '.csv')
+        print(f"{rollup}: {len(combined.files)} files, {combined.rows} rows")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze survey CSV exports without the app.")
+    parser.add_argument('paths', nargs='+', help="CSV files, folders of CSV files or summary .json records")
+    parser.add_argument('-o', '--output', default='summaries', help="folder for the summaries")
+    parser.add_argument('--csv', action='store_true', help="also write a CSV table per summary")
+    parser.add_argument('--rollup', help="write the merged summary of all inputs to this .json file")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help="files analyzed at the same time")
+    parser.add_argument('--cache', default=CACHE_FILE, help="sentiment cache path (without extension)")
+    parser.add_argument('--result-cache', default=RESULT_CACHE_DIR,
+                        help="folder of cached whole-file results ('' to always re-analyze)")
+    parser.add_argument('--annotate', choices=FORMATS,
+                        help="also write every row with its predicted sentiment in this format")
+    parser.add_argument('--profile', help="append per-file timings and counts to this .jsonl log")
+    args = parser.parse_args(argv)
+
+    inputs = find_inputs(args.paths)
+    if not inputs:
+        parser.error("no CSV files found")
+
+    rows = run(inputs, args.output, args.jobs, args.cache, args.csv, args.rollup, args.result_cache,
+               args.annotate, args.profile)
+    return 1 if any(row.get('error') for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
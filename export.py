@@ -0,0 +1,66 @@
+import csv
+import json
+import os
+
+SENTIMENT_COLUMN = 'Predicted_Sentiment'
+FORMATS = ('csv', 'jsonl')
+
+
+def annotated_path(csv_file, fmt='csv'):
+    """<name>.annotated.<fmt> next to the survey file, as the app saves it."""
+    return f"{os.path.splitext(csv_file)[0]}.annotated.{fmt}"
+
+
+class AnnotatedWriter:
+    """
+    Streams survey rows, each with its predicted sentiment, to a CSV or
+    JSONL file.
+
+    Rows are written as soon as their chunk is classified and are not kept
+    afterwards, so exporting a large file needs no more memory than one
+    chunk. The CSV output is the original header plus a
+    Predicted_Sentiment column; every JSONL line is an object of header ->
+    value with the same extra key.
+    """
+
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.fmt = fmt or ('jsonl' if path.lower().endswith('.jsonl') else 'csv')
+        if self.fmt not in FORMATS:
+            raise ValueError(f"unknown export format {self.fmt!r}, expected one of {FORMATS}")
+        self._file = None
+        self._writer = None
+        self._header = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self, header):
+        """Opens the output and writes the header; called once before write."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8', newline='')
+        self._header = list(header)
+        if self.fmt == 'csv':
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self._header + [SENTIMENT_COLUMN])
+
+    def write(self, rows, sentiments):
+        """Writes rows with their sentiments (None when the file has no comments)."""
+        if self.fmt == 'csv':
+            self._writer.writerows(row + [sentiment or ''] for row, sentiment in zip(rows, sentiments))
+        else:
+            header = self._header
+            self._file.writelines(
+                json.dumps({**dict(zip(header, row)), SENTIMENT_COLUMN: sentiment}, ensure_ascii=False) + '\n'
+                for row, sentiment in zip(rows, sentiments)
+            )
+
+    def close(self):
+        if self._file is not None:
+            file, self._file = self._file, None
+            file.close()
@@ -0,0 +1,134 @@
+import os
+import threading
+
+from kivy.clock import Clock
+from kivy.metrics import dp
+from kivy.properties import BooleanProperty, ObjectProperty, StringProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+from kivy.uix.popup import Popup
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+
+ENTRY_HEIGHT = 44
+FOLDER_COLOR = (17 / 255, 46 / 255, 83 / 255, 1)
+FILE_COLOR = (9 / 255, 25 / 255, 47 / 255, 1)
+RECENT_COLOR = (0xF2 / 255, 0xC1 / 255, 0x5F / 255, 1)
+
+
+class BrowserEntry(Button):
+    """One row of the browser list: a folder, a CSV file or a message."""
+
+    path = StringProperty("")
+    is_dir = BooleanProperty(False)
+    browser = ObjectProperty(None, allownone=True)
+
+    def on_release(self):
+        if self.browser is not None and self.path:
+            self.browser.open_entry(self.path, self.is_dir)
+
+
+class FileBrowser(Popup):
+    """
+    CSV picker that never lists a folder on the UI thread.
+
+    Folders are scanned on a background thread through a
+    browser.DirectoryCache; a folder seen before shows its cached listing
+    at once while it is revalidated. The recent CSVs of a
+    browser.BrowserState are listed first, before any disk access, and
+    browsing starts in the last folder used. Only rows on screen get
+    widgets (RecycleView), so large folders stay cheap to show. on_select
+    is called with the chosen path.
+    """
+
+    def __init__(self, state, cache, on_select, **kwargs):
+        super().__init__(title="Select a File", size_hint=(0.9, 0.9), auto_dismiss=False, **kwargs)
+        self.state = state
+        self.cache = cache
+        self.on_select = on_select
+        self.folder = None
+        self._generation = 0
+
+        self.path_label = Label(size_hint_y=None, height=dp(30), font_size="12sp", shorten=True,
+                                shorten_from='left')
+        self.path_label.bind(size=lambda label, size: setattr(label, 'text_size', size))
+
+        # ONLY THE ROWS ON SCREEN GET WIDGETS
+        self.entries = RecycleView()
+        entry_layout = RecycleBoxLayout(orientation='vertical', size_hint_y=None, spacing=dp(2),
+                                        default_size=(None, dp(ENTRY_HEIGHT)), default_size_hint=(1, None))
+        entry_layout.bind(minimum_height=entry_layout.setter('height'))
+        self.entries.add_widget(entry_layout)
+        self.entries.viewclass = BrowserEntry
+
+        buttons = BoxLayout(size_hint_y=None, height=dp(ENTRY_HEIGHT), spacing=dp(4))
+        buttons.add_widget(Button(text="Up", on_release=lambda button: self.open_parent(), bold=True))
+        buttons.add_widget(Button(text="Cancel", on_release=lambda button: self.dismiss(), bold=True))
+
+        layout = BoxLayout(orientation='vertical', spacing=dp(4))
+        layout.add_widget(self.path_label)
+        layout.add_widget(self.entries)
+        layout.add_widget(buttons)
+        self.content = layout
+
+    def on_open(self):
+        self.open_folder(self.folder or self.state.start_folder())
+
+    # LISTING
+    def open_folder(self, folder):
+        self.folder = folder
+        self.path_label.text = folder
+        self._generation += 1
+        generation = self._generation
+
+        cached = self.cache.cached(folder)
+        self.show_entries(cached if cached is not None else [], loading=cached is None)
+        threading.Thread(target=self._list_folder, args=(folder, generation), daemon=True).start()
+
+    def _list_folder(self, folder, generation):
+        try:
+            entries = self.cache.list(folder)
+        except OSError as e:
+            message = f"Cannot open this folder: {e.strerror or e}"
+            Clock.schedule_once(lambda dt: self.on_listing_error(generation, message))
+            return
+        Clock.schedule_once(lambda dt: self.on_listing(generation, entries))
+
+    def on_listing(self, generation, entries):
+        if generation == self._generation:
+            self.show_entries(entries)
+
+    def on_listing_error(self, generation, message):
+        if generation == self._generation:
+            self.show_entries([], message=message)
+
+    def show_entries(self, entries, loading=False, message=""):
+        data = [
+            {"text": f"Recent: {os.path.basename(path)}", "path": path, "is_dir": False,
+             "browser": self, "background_color": RECENT_COLOR}
+            for path in self.state.recent
+        ]
+        if loading or message or not entries:
+            text = "Loading..." if loading else message or "No folders or CSV files here."
+            data.append({"text": text, "path": "", "is_dir": False, "browser": None,
+                         "background_color": FILE_COLOR})
+        data.extend(
+            {"text": name + "/" if is_dir else name, "path": path, "is_dir": is_dir, "browser": self,
+             "background_color": FOLDER_COLOR if is_dir else FILE_COLOR}
+            for name, path, is_dir in entries
+        )
+        self.entries.data = data
+
+    # NAVIGATION
+    def open_parent(self):
+        parent = os.path.dirname(self.folder.rstrip(os.sep)) or os.sep
+        if parent != self.folder:
+            self.open_folder(parent)
+
+    def open_entry(self, path, is_dir):
+        if is_dir:
+            self.open_folder(path)
+        else:
+            self.dismiss()
+            self.on_select(path)
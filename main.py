@@ -1,20 +1,32 @@
-import csv
-import re
-from collections import defaultdict
+import time
+
+# STARTUP TIMINGS, SEE benchmarks/bench_startup.py
+STARTUP_TIMES = {"start": time.perf_counter()}
 
-# import joblib
 import json
+import multiprocessing
 import os
+import threading
+
+# A FROZEN BUILD RE-RUNS THIS SCRIPT IN EVERY SENTIMENT WORKER PROCESS; STOP
+# THEM HERE, BEFORE KIVY OPENS A WINDOW
+multiprocessing.freeze_support()
+
 from kivy.config import Config
 
 WIDTH  = int(750  * 0.5) 
 HEIGHT = int(1400 * 0.5) 
-Config.set('graphics', 'width', WIDTH)
-Config.set('graphics', 'height', HEIGHT)
-Config.set('graphics', 'resizable', 0)
-Config.write()
+GRAPHICS_CONFIG = {'width': WIDTH, 'height': HEIGHT, 'resizable': 0}
+
+# ONLY TOUCH config.ini WHEN A VALUE ACTUALLY CHANGED
+config_changed = False
+for key, value in GRAPHICS_CONFIG.items():
+    if not Config.has_option('graphics', key) or Config.get('graphics', key) != str(value):
+        Config.set('graphics', key, value)
+        config_changed = True
+if config_changed:
+    Config.write()
 
-import random
 from kivy.utils import platform
 from kivy.core.window import Window
 
@@ -28,17 +40,38 @@ from kivy.app import App
 from kivy.uix.widget import Widget
 from kivy.uix.label import Label
 from kivy.uix.button import Button
-from kivy.graphics import Color, Ellipse, RoundedRectangle
 from kivy.uix.popup import Popup
 # from kivymd.uix.filemanager import MDFileManager
-from kivy.animation import Animation
-from kivy.properties import NumericProperty, StringProperty
-from kivy.uix.filechooser import FileChooserListView
-from kivy.uix.popup import Popup
-from kivy.uix.button import Button
-from kivy.uix.boxlayout import BoxLayout
+from kivy.clock import Clock
+from kivy.properties import BooleanProperty, NumericProperty, ObjectProperty, StringProperty
 from kivy.lang import Builder
-Builder.load_file('design.kv')
+
+from analysis import AnalysisCancelled, AnalysisError, analyze_csv
+from browser import BrowserState, DirectoryCache, check_header
+from categories import default_rules
+from charts import BarChart, PieChart
+from export import AnnotatedWriter, annotated_path
+from profiling import NULL_PROFILE, RunProfile, profile_path, summary_text
+from result_cache import ResultCache
+from sentiment import SentimentModel
+from sentiment_cache import SentimentCache
+from watch import SurveyTail
+
+# SECONDS BETWEEN DASHBOARD UPDATES WHILE A FILE IS STILL BEING ANALYZED
+PARTIAL_RESULT_INTERVAL = 0.5
+
+NEGATIVE_COLOR = (237 / 255, 106 / 255, 110 / 255)
+NEUTRAL_COLOR = (240 / 255, 137 / 255, 44 / 255)
+POSITIVE_COLOR = (134 / 255, 207 / 255, 111 / 255)
+PIE_HOLE_COLOR = (9 / 255, 25 / 255, 47 / 255)
+
+# SECONDS BETWEEN CHECKS OF A WATCHED FILE FOR NEW ROWS
+WATCH_INTERVAL = 2.0
+
+# SET SURVEY_PROFILE TO LOG EVERY ANALYSIS RUN AND SHOW THE DEBUG OVERLAY
+PROFILE_PATH = profile_path()
+
+STARTUP_TIMES["imports"] = time.perf_counter()
 
 
 
@@ -69,6 +102,12 @@ class MainWidget(Widget):
     full_comments_file = StringProperty("")
     category_name = StringProperty("NONE")
     subcategory_name = StringProperty("")
+    progress_text = StringProperty("")
+    profile_text = StringProperty("")
+    file_status = StringProperty("")
+    file_usable = ObjectProperty(None, allownone=True)
+    watching = BooleanProperty(False)
+    annotate = BooleanProperty(False)
 
 
     def __init__(self, **kwargs):
@@ -78,45 +117,82 @@ class MainWidget(Widget):
         self.current_index = 0
         self.sub_current_index = 0
 
-        # self.model = joblib.load('naive_bayes_model.joblib')
-        # self.vectorizer = joblib.load('tfidf_vectorizer.joblib')
-        # self.encoder = joblib.load('label_encoder.joblib')
-
-        self.model = None
-        self.vectorizer = None
-        self.encoder = None
+        # LOADED ON THE FIRST PREDICTION
+        self.sentiment_model = SentimentModel()
+        self.sentiment_cache = SentimentCache()
+        self.result_cache = ResultCache(context=default_rules().signature)
+
+        # FILE PICKER, CREATED ON FIRST USE; FOLDER LISTINGS ARE KEPT BETWEEN OPENINGS
+        self.file_browser = None
+        self.browser_state = BrowserState()
+        self.directory_cache = DirectoryCache()
+
+        # ONE SUMMARY PER (CATEGORY, SUBCATEGORY) OF THE LOADED FILE
+        self.summary_index = []
+        self.sub_category_list = []
+
+        # ANALYSIS RUNNING IN THE BACKGROUND
+        self.analysis_thread = None
+        self.analysis_cancel = None
+        self.partial_result = None
+        self.analysis_profile = NULL_PROFILE
+        self.sentiment_notice = None
+        self.show_partial_result = Clock.create_trigger(self.on_partial_result, PARTIAL_RESULT_INTERVAL)
+
+        # WATCH MODE: ONLY THE ROWS APPENDED TO THE FILE SINCE THE LAST CHECK ARE ANALYZED
+        self.survey_tail = None
+        self.watch_poll = None
+
+        # CHARTS, DRAWN ONCE AND ANIMATED IN PLACE
+        self.negative_bar = BarChart(self.ids.negative_bar, NEGATIVE_COLOR)
+        self.neutral_bar = BarChart(self.ids.neutral_bar, NEUTRAL_COLOR)
+        self.positive_bar = BarChart(self.ids.positive_bar, POSITIVE_COLOR)
+        self.star_bars = [BarChart(self.ids[f"star_{star}"], NEGATIVE_COLOR) for star in range(1, 6)]
+        self.engagement_pie = PieChart(
+            self.ids.engagement_pie, [NEGATIVE_COLOR, NEUTRAL_COLOR, POSITIVE_COLOR], PIE_HOLE_COLOR)
+
+    def on_full_comments_file(self, instance, value):
+        self.stop_watch()
+        self.cancel_analysis()
+        self.summary_index = []
+        self.sub_category_list = []
+        self.file_usable = None
+        self.file_status = "CHECKING FILE..." if value else ""
+        if value:
+            threading.Thread(target=self.check_file, args=(value,), daemon=True).start()
+
+    # RUNS ON A WORKER THREAD: ONLY THE HEADER IS READ
+    def check_file(self, csv_file):
+        usable, message = check_header(csv_file)
+        if usable:
+            self.browser_state.remember(csv_file)
+        Clock.schedule_once(lambda dt: self.on_file_checked(csv_file, usable, message))
+        if usable:
+            # THE MODEL LOADS WHILE THE FILE IS BEING LOOKED AT, NOT AFTER SUBMIT
+            try:
+                self.sentiment_model.load()
+            except Exception as e:
+                print(f"Warning: could not load the sentiment model: {e}")
+
+    def on_file_checked(self, csv_file, usable, message):
+        if csv_file != self.full_comments_file:
+            return  # ANOTHER FILE WAS PICKED IN THE MEANTIME
+        self.file_usable = usable
+        self.file_status = message
 
     def on_image_click(self):
         self.open_file_manager()
 
     def open_file_manager(self):
-        self.file_chooser = FileChooserListView()
-        self.file_chooser.path = '/' 
-        self.file_chooser.filters = ['*.csv']
-
-        select_button = Button(text="Select", on_press=self.select_file)
-        layout = BoxLayout(orientation='vertical')
-        layout.add_widget(self.file_chooser)
-        layout.add_widget(select_button)
-
-        self.popup = Popup(
-            title="Select a File",
-            content=layout,
-            size_hint=(0.9, 0.9),
-            auto_dismiss=False
-        )
-        self.popup.open()
+        # IMPORTED ON FIRST USE, IT IS NOT NEEDED TO SHOW THE DASHBOARD
+        if self.file_browser is None:
+            from file_browser import FileBrowser
+            self.file_browser = FileBrowser(self.browser_state, self.directory_cache, self.select_file)
+        self.file_browser.open()
 
-    def select_file(self, instance):
-        selected_path = self.file_chooser.selection
-        if selected_path:
-            path = selected_path[0]
-            if path.endswith('.csv'):
-                self.full_comments_file = path
-                print(f"File selected: {path}")
-            else:
-                self.show_error_popup("Invalid file type", "Please select a CSV file.")
-        self.popup.dismiss()
+    def select_file(self, path):
+        self.full_comments_file = path
+        print(f"File selected: {path}")
 
     def show_error_popup(self, title, message):
         error_popup = Popup(
@@ -132,220 +208,216 @@ class MainWidget(Widget):
 
 
 
-    # TRANSFORM
-    def simplify_text(self, text):
-        """Simplifies text by removing numbers, punctuation, and stopwords."""
-        return text.lower().replace(" ", "").strip()
-
-
-
-    # CATEGORIZE
-    def categorize_columns(self, header):
-        """Smart categorization of columns into categories."""
-        category_map = defaultdict(list)
-        current_category = None
-
-        for col_name in header[4:]:
-            simplified_name = self.simplify_text(col_name)
-
-            if any(keyword in simplified_name for keyword in ["coordination", "gathered", "activity"]):
-                current_category = "Coordination"
-            elif any(keyword in simplified_name for keyword in ["objectives", "goals"]):
-                current_category = "Objectives"
-            elif any(keyword in simplified_name for keyword in ["feedback", "comment", "suggestion"]):
-                current_category = "Feedback"
-            elif any(keyword in simplified_name for keyword in ["discussions", "participation", "inputs"]):
-                current_category = "Discussions"
-            elif any(keyword in simplified_name for keyword in ["accessibility", "convenience", "comfort"]):
-                current_category = "Accessibility"
-            else:
-                current_category = "Other" 
-            category_map[current_category].append(col_name)
-        return category_map
-
-
-    def process_csv_to_3d_list(self, csv_file):
-        result = []
-
-        with open(csv_file, 'r', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            header = next(reader)  
-            category_map = self.categorize_columns(header)
-
-            for row in reader:
-                row_index = 4 
-                for category, subcategories in category_map.items():
-                    category_data = next((item for item in result if item["category"] == category), None)
-                    if not category_data:
-                        category_data = {"category": category, "subcategories": []}
-                        result.append(category_data)
-
-                    for subcat in subcategories:
-                        try:
-                            if "Feedback" not in category:  
-                                stars = int(row[row_index]) 
-                                category_data["subcategories"].append({"subcategory": subcat, "stars": stars})
-                            else:
-                                feedback = row[row_index]
-                                category_data["subcategories"].append({"subcategory": subcat, "text": feedback})
-                            row_index += 1
-                        except:
-                            pass
-
-        return result
-
-
-
-    def aggregate_subcategories(self, subcategories):
-        """Group subcategories and aggregate stars."""
-        aggregated_data = defaultdict(lambda: [0, 0, 0, 0, 0]) 
-
-        for item in subcategories:
-            if not (item.get('stars') or not item.get('subcategory')):
-                return {"subcategory": "NUN", "stars": [0, 0, 0, 0, 0]}
-
-            subcategory = item['subcategory']
-            stars = item['stars']
-            aggregated_data[subcategory][stars - 1] += 1
-
-        result = [
-            {"subcategory": subcategory, "stars": counts}
-            for subcategory, counts in aggregated_data.items()
-        ]
-        return result
-
-
-
-
     # OPEN CSV
     def open_csv(self):
         if not self.full_comments_file:
             self.show_error_popup("Invalid Submit", "File is missing.")
             print("INVALID SUBMIT")
             return
-
-        try:
-            with open(self.full_comments_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                full_df = [row for row in reader]
-        except Exception as e:
-            self.show_error_popup("File Read Error", f"Error reading the file: {e}")
+        if self.file_usable is False:
+            self.show_error_popup("Invalid File", self.file_status)
             return
 
+        self.stop_watch()
+        self.cancel_analysis()
+        cancel_event = threading.Event()
+        self.analysis_cancel = cancel_event
+        self.progress_text = "ANALYZING..."
+        self.sentiment_notice = None
         self.current_index = 0
         self.sub_current_index = 0
-        self.structured_data = self.process_csv_to_3d_list(self.full_comments_file)
-
-        sentiment_cache_file = 'sentiment_cache.json'
-        if os.path.exists(sentiment_cache_file):
-            with open(sentiment_cache_file, 'r', encoding='utf-8') as f:
-                sentiment_cache = json.load(f)
-        else:
-            sentiment_cache = {}
+        if PROFILE_PATH:
+            self.analysis_profile = RunProfile(self.full_comments_file, self.sentiment_cache)
+
+        self.analysis_thread = threading.Thread(
+            target=self.run_analysis,
+            args=(self.full_comments_file, cancel_event, self.analysis_profile,
+                  annotated_path(self.full_comments_file) if self.annotate else None),
+            daemon=True
+        )
+        self.analysis_thread.start()
 
-        if self.structured_data:
-            self.category_name = self.structured_data[self.current_index].get('category', 'Unknown Category')
+    def cancel_analysis(self):
+        if self.analysis_cancel is not None:
+            self.analysis_cancel.set()
+            self.analysis_cancel = None
+            self.partial_result = None
+            self.analysis_profile = NULL_PROFILE
+            self.progress_text = ""
 
-            self.sub_category_list = self.aggregate_subcategories(self.structured_data[self.current_index].get('subcategories', []))
+    # RUNS ON THE WORKER THREAD, RESULTS GO BACK THROUGH THE CLOCK
+    def run_analysis(self, csv_file, cancel_event, profile, annotated_file=None):
+        def on_chunk(result):
+            Clock.schedule_once(lambda dt: self.on_analysis_chunk(cancel_event, result))
 
-            if self.sub_category_list:
-                data = self.sub_category_list[self.sub_current_index]
-                total_votes = sum(data['stars'])
-                star_percentages = [(votes / total_votes) * 100 if total_votes > 0 else 0 for votes in data['stars']]
-                
-                self.subcategory_name = re.sub(r'^\d+\.\s*', '', data['subcategory'])
-                self.subcategory_star = star_percentages
-
-                self.number_star_1 = f'{data['stars'][0]}'
-                self.number_star_2 = f'{data['stars'][1]}'
-                self.number_star_3 = f'{data['stars'][2]}'
-                self.number_star_4 = f'{data['stars'][3]}'
-                self.number_star_5 = f'{data['stars'][4]}'
-
-                stars = data['stars']
-                total_votes = sum(stars)
-
-                if total_votes > 0:
-                    weighted_average = sum((i + 1) * stars[i] for i in range(5)) / total_votes
-                else:
-                    weighted_average = 0 
-
-                if weighted_average >= 4.8:
-                    self.result_text = "Very Satisfactory"
-                    self.result_color = "#00FF00"
-                elif 3.5 <= weighted_average < 4.8:
-                    self.result_text = "Satisfactory"
-                    self.result_color = "#FFA500"
-                elif 2.5 <= weighted_average < 3.5:
-                    self.result_text = "Needs Improvement"
-                    self.result_color = "#FFCC00"
-                else:
-                    self.result_text = "Needs Enhancement"
-                    self.result_color = "#FF0000" 
-
-                colors = (237 / 255, 106 / 255, 110 / 255)
-                for i, percentage in enumerate(star_percentages):
-                    star_id = f"star_{i + 1}"
-                    if hasattr(self.ids, star_id):
-                        self.redraw_canvas(getattr(self.ids, star_id), colors, percentage)
-                    else:
-                        print(f"Warning: {star_id} does not exist in self.ids.")
+        try:
+            if annotated_file is None:
+                result = analyze_csv(
+                    csv_file, self.sentiment_model, self.sentiment_cache, on_chunk, cancel_event,
+                    result_cache=self.result_cache, profile=profile
+                )
             else:
-                print("Warning: No subcategories available.")
-        else:
-            print("Warning: No data available in structured data.")
-
-        # Simulate predicted sentiments
-        target = None
-        if full_df:
-            for col in ['comment', 'comments', 'review', 'text']:
-                for key in full_df[0].keys():
-                    if col in key.lower():
-                        target = [row[key] for row in full_df]
-                        break
-                if target:
-                    break
-
-            if target is None:
-                print("Missing Column: The file must contain a 'comment, review, text' column.")
-                return
-        else:
+                # EVERY ROW WITH ITS SENTIMENT, WRITTEN AS ITS CHUNK IS CLASSIFIED
+                with AnnotatedWriter(annotated_file) as export:
+                    result = analyze_csv(
+                        csv_file, self.sentiment_model, self.sentiment_cache, on_chunk, cancel_event,
+                        result_cache=self.result_cache, export=export, profile=profile
+                    )
+                if not result.get("export_error"):
+                    result["annotated_file"] = annotated_file
+        except AnalysisCancelled:
+            return
+        except AnalysisError as e:
+            Clock.schedule_once(lambda dt: self.on_analysis_error(cancel_event, e.title, e.message))
+            return
+        except Exception as e:
+            Clock.schedule_once(lambda dt: self.on_analysis_error(cancel_event, "Analysis Error", str(e)))
+            return
+        Clock.schedule_once(lambda dt: self.on_analysis_done(cancel_event, result))
+
+    def on_analysis_chunk(self, cancel_event, result):
+        if cancel_event is self.analysis_cancel:
+            self.progress_text = f"ANALYZING {result['fraction']:.0%}"
+            self.partial_result = result
+            self.show_partial_result()
+
+    def on_analysis_error(self, cancel_event, title, message):
+        if cancel_event is self.analysis_cancel:
+            self.stop_watch()
+            self.analysis_cancel = None
+            self.partial_result = None
+            self.analysis_profile = NULL_PROFILE
+            self.progress_text = ""
+            self.show_error_popup(title, message)
+
+    def on_analysis_done(self, cancel_event, result):
+        if cancel_event is not self.analysis_cancel:
+            return
+        self.analysis_cancel = None
+        self.partial_result = None
+        self.progress_text = ""
+
+        with self.analysis_profile.stage("draw"):
+            self.show_result(result)
+        sentiment_error = result.get("sentiment_error")
+        if sentiment_error:
+            # ONCE PER RUN OR WATCH, NOT ON EVERY UPDATE OF A WATCHED FILE
+            if sentiment_error != self.sentiment_notice:
+                self.sentiment_notice = sentiment_error
+                self.show_error_popup("Sentiment Unavailable", "Ratings only: the sentiment model could not run.")
+        elif not result["summary"].comments:
             print("Missing Column: The file must contain a 'comment, review, text' column.")
+        if result.get("export_error"):
+            self.show_error_popup("Export Error", "Annotated copy not saved.")
+        elif result.get("annotated_file"):
+            print(f"Annotated copy saved: {result['annotated_file']}")
+            if not sentiment_error:
+                self.show_error_popup("Annotated Copy Saved", os.path.basename(result["annotated_file"]))
+        if PROFILE_PATH:
+            self.write_profile()
+
+    # WATCH
+    def toggle_annotate(self):
+        self.annotate = not self.annotate
+
+    def toggle_watch(self):
+        if self.watching:
+            self.stop_watch()
+            return
+        if not self.full_comments_file:
+            self.show_error_popup("Invalid Watch", "File is missing.")
+            return
+        if self.file_usable is False:
+            self.show_error_popup("Invalid File", self.file_status)
             return
 
-        sentiments = ['Positive', 'Neutral', 'Negative']
-        predicted_sentiments = []
-        for comment in target:
-            if comment in sentiment_cache:
-                sentiment = sentiment_cache[comment]
-            else:
-                sentiment = random.choice(sentiments)
-                sentiment_cache[comment] = sentiment
-            predicted_sentiments.append(sentiment)
-
-        # Save updated sentiment cache
-        with open(sentiment_cache_file, 'w', encoding='utf-8') as f:
-            json.dump(sentiment_cache, f, ensure_ascii=False, indent=4)
+        self.cancel_analysis()
+        self.current_index = 0
+        self.sub_current_index = 0
+        self.survey_tail = SurveyTail(self.full_comments_file)
+        self.sentiment_notice = None
+        self.watching = True
+        self.watch_poll = Clock.schedule_interval(self.poll_watch, WATCH_INTERVAL)
+        self.poll_watch(0)
+
+    def stop_watch(self):
+        if self.watch_poll is not None:
+            self.watch_poll.cancel()
+            self.watch_poll = None
+        if self.watching:
+            self.cancel_analysis()
+        self.survey_tail = None
+        self.watching = False
+
+    # A STAT ON THE UI THREAD; THE NEW ROWS ARE READ AND CLASSIFIED ON A WORKER
+    def poll_watch(self, dt):
+        if self.analysis_cancel is not None or not self.survey_tail.changed():
+            return
+        cancel_event = threading.Event()
+        self.analysis_cancel = cancel_event
+        self.progress_text = "UPDATING..."
+        if PROFILE_PATH:
+            self.analysis_profile = RunProfile(self.full_comments_file, self.sentiment_cache)
+
+        self.analysis_thread = threading.Thread(
+            target=self.run_watch,
+            args=(self.survey_tail, cancel_event, self.analysis_profile),
+            daemon=True
+        )
+        self.analysis_thread.start()
 
-        for i, row in enumerate(full_df):
-            row['Predicted_Sentiment'] = predicted_sentiments[i]
+    def run_watch(self, survey_tail, cancel_event, profile):
+        try:
+            result = survey_tail.update(self.sentiment_model, self.sentiment_cache, cancel_event, profile)
+        except AnalysisCancelled:
+            return
+        except AnalysisError as e:
+            Clock.schedule_once(lambda dt: self.on_analysis_error(cancel_event, e.title, e.message))
+            return
+        except Exception as e:
+            Clock.schedule_once(lambda dt: self.on_analysis_error(cancel_event, "Analysis Error", str(e)))
+            return
+        Clock.schedule_once(lambda dt: self.on_analysis_done(cancel_event, result))
+
+    # AT MOST ONE PARTIAL DASHBOARD PER PARTIAL_RESULT_INTERVAL
+    def on_partial_result(self, dt):
+        if self.partial_result is not None:
+            with self.analysis_profile.stage("draw"):
+                self.show_result(self.partial_result)
+            self.partial_result = None
+
+    def write_profile(self):
+        profile, self.analysis_profile = self.analysis_profile, NULL_PROFILE
+        record = profile.finish(platform=platform)
+        self.profile_text = summary_text(record)
+        try:
+            profile.write(PROFILE_PATH)
+        except OSError as e:
+            print(f"Warning: could not write the profile to {PROFILE_PATH}: {e}")
+
+    def show_result(self, result):
+        self.summary_index = result["summary_index"]
+        if self.current_index >= len(self.summary_index):
+            self.current_index = 0
+            self.sub_current_index = 0
+        self.update_subcategory_data()
 
-        positive_comments = [row for row in full_df if row['Predicted_Sentiment'] == 'Positive']
-        negative_comments = [row for row in full_df if row['Predicted_Sentiment'] == 'Negative']
-        neutral_comments = [row for row in full_df if row['Predicted_Sentiment'] == 'Neutral']
+        if result["summary"].comments:
+            self.update_sentiment_data(result["summary"].sentiments)
 
-        self.positive_len = len(positive_comments)
-        self.negative_len = len(negative_comments)
-        self.neutral_len = len(neutral_comments)
+    def update_sentiment_data(self, sentiments):
+        self.positive_len = sentiments['Positive']
+        self.negative_len = sentiments['Negative']
+        self.neutral_len = sentiments['Neutral']
 
-        total_comments = len(full_df)
+        total_comments = self.positive_len + self.negative_len + self.neutral_len
         self.positive_percent = (self.positive_len / total_comments) * 100 if total_comments else 0
         self.neutral_percent = (self.neutral_len / total_comments) * 100 if total_comments else 0
         self.negative_percent = (self.negative_len / total_comments) * 100 if total_comments else 0
 
-        self.redraw_canvas(self.ids.negative_bar, (237 / 255, 106 / 255, 110 / 255), self.negative_percent)
-        self.redraw_canvas(self.ids.neutral_bar, (240 / 255, 137 / 255, 44 / 255), self.neutral_percent)
-        self.redraw_canvas(self.ids.positive_bar, (134 / 255, 207 / 255, 111 / 255), self.positive_percent)
+        self.negative_bar.set_percent(self.negative_percent)
+        self.neutral_bar.set_percent(self.neutral_percent)
+        self.positive_bar.set_percent(self.positive_percent)
 
         percentages = {
             "POSITIVE": self.positive_percent,
@@ -355,23 +427,7 @@ class MainWidget(Widget):
 
         self.max_percent_label = max(percentages, key=percentages.get)
         self.max_percent = int(percentages[self.max_percent_label])
-        self.draw_pie_chart([self.negative_percent, self.neutral_percent, self.positive_percent])
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        self.engagement_pie.set_values([self.negative_percent, self.neutral_percent, self.positive_percent])
 
 
     def prev_subcategory(self):
@@ -390,7 +446,7 @@ class MainWidget(Widget):
         if self.sub_current_index < len(self.sub_category_list) - 1:
             self.sub_current_index += 1
         else:
-            if self.current_index < len(self.structured_data) - 1:
+            if self.current_index < len(self.summary_index) - 1:
                 self.current_index += 1
                 self.sub_current_index = 0
             else:
@@ -400,19 +456,14 @@ class MainWidget(Widget):
         self.update_subcategory_data()
 
     def update_subcategory_data(self):
-        if self.structured_data and self.current_index < len(self.structured_data):
-            self.category_name = self.structured_data[self.current_index].get('category', 'Unknown Category')
-            
-            subcategories = self.structured_data[self.current_index].get('subcategories', [])
-            self.sub_category_list = self.aggregate_subcategories(subcategories)
-            
+        if self.summary_index and self.current_index < len(self.summary_index):
+            self.category_name, self.sub_category_list = self.summary_index[self.current_index]
+
             if self.sub_category_list and 0 <= self.sub_current_index < len(self.sub_category_list):
                 data = self.sub_category_list[self.sub_current_index]
-                total_votes = sum(data['stars'])
-                star_percentages = [(votes / total_votes) * 100 if total_votes > 0 else 0 for votes in data['stars']]
-                
-                self.subcategory_name = re.sub(r'^\d+\.\s*', '', data['subcategory'])
-                self.subcategory_star = star_percentages
+
+                self.subcategory_name = data['name']
+                self.subcategory_star = data['percentages']
 
                 self.number_star_1 = f"{data['stars'][0]}"
                 self.number_star_2 = f"{data['stars'][1]}"
@@ -420,105 +471,15 @@ class MainWidget(Widget):
                 self.number_star_4 = f"{data['stars'][3]}"
                 self.number_star_5 = f"{data['stars'][4]}"
 
-                stars = data['stars']
-                total_votes = sum(stars)
-
-                if total_votes > 0:
-                    weighted_average = sum((i + 1) * stars[i] for i in range(5)) / total_votes
-                else:
-                    weighted_average = 0 
-
-                if weighted_average >= 4.8:
-                    self.result_text = "Very Satisfactory"
-                    self.result_color = "#00FF00"
-                elif 3.5 <= weighted_average < 4.8:
-                    self.result_text = "Satisfactory"
-                    self.result_color = "#FFA500"
-                elif 2.5 <= weighted_average < 3.5:
-                    self.result_text = "Needs Improvement"
-                    self.result_color = "#FFCC00"
-                else:
-                    self.result_text = "Needs Enhancement"
-                    self.result_color = "#FF0000" 
-
-                colors = (237 / 255, 106 / 255, 110 / 255)
-                for i, percentage in enumerate(star_percentages):
-                    star_id = f"star_{i + 1}"
-                    if hasattr(self.ids, star_id):
-                        self.redraw_canvas(getattr(self.ids, star_id), colors, percentage)
-                    else:
-                        print(f"Warning: {star_id} does not exist in self.ids.")
+                self.result_text = data['result_text']
+                self.result_color = data['result_color']
+
+                for bar, percentage in zip(self.star_bars, data['percentages']):
+                    bar.set_percent(percentage)
             else:
                 print("Warning: No subcategories available.")
         else:
             print("Warning: No data available in structured data.")
-    
-    # REDRAW THE BAR
-    def redraw_canvas(self, widget, color, percent):
-        widget.canvas.clear()
-        with widget.canvas.before:
-            Color(17/255,46/255,83/255)
-            RoundedRectangle(size=widget.size, pos=widget.pos)
-
-        def animate_rectangle(*args):
-            widget.canvas.clear()
-            with widget.canvas.before:
-                Color(17 / 255, 46 / 255, 83 / 255)
-                RoundedRectangle(size=widget.size, pos=widget.pos)
-
-                Color(*color)
-                # Draw the rectangle with initial size 0
-                rect = RoundedRectangle(size=(0, widget.height), pos=widget.pos)
-
-            # Create an animation to increase the size
-            anim = Animation(size=(widget.width / 100 * percent, widget.height), duration=0.5)
-            anim.start(rect)
-        animate_rectangle()
-
-
-    def draw_pie_chart(self, data):
-        total = sum(data)
-        colors = [
-            (237 / 255, 106 / 255, 110 / 255),
-            (240 / 255, 137 / 255, 44 / 255), 
-            (134 / 255, 207 / 255, 111 / 255)]
-    
-        engagement = self.ids.engagement_pie
-        engagement.canvas.clear()
-
-        self.animate_pie(engagement, colors, 0, 0, data, total)
-    
-
-    # ANIMATION OF PIE CHART BEING DRAWN
-    def animate_pie(self, engagement, colors, index, start_angle, data, total):
-        if (index > 2):
-            with engagement.canvas:
-                Color(9 / 255, 25 / 255, 47 / 255)
-                pie = Ellipse(
-                    pos=(
-                        (engagement.x + engagement.parent.width / 2 - 60 + engagement.width / 4) + engagement.width / 4,
-                        (engagement.y - 40 + engagement.height / 4) + engagement.height / 4),
-                    size=(1, 1)
-                )
-                Animation(size=(engagement.width / 2, engagement.height / 2),
-                    pos=((engagement.x + engagement.parent.width / 2 - 60 + engagement.width / 4),
-                        (engagement.y - 40 + engagement.height / 4)), duration=0.5).start(pie)
-            return
-
-        angle = 360 * (data[index] / total)
-        with engagement.canvas:
-            Color(*colors[index])
-            pie_segment = Ellipse(
-                pos=(engagement.x + engagement.parent.width / 2 - 60, engagement.y - 40),
-                size=engagement.size,
-                angle_start=start_angle,
-                angle_end=start_angle
-            )
-        animation = Animation(angle_end=start_angle + angle, duration=0.5)
-        start_angle += angle
-
-        animation.bind(on_complete=lambda *_: self.animate_pie(engagement, colors, index+1, start_angle, data, total))
-        animation.start(pie_segment)
 
     def show_error_popup(self, title, message):
         content = Label(text=message, size_hint=(1, 0.8), font_size="28sp", bold=True)
@@ -536,10 +497,31 @@ class MainWidget(Widget):
 class MainApp(App):
 
     def build(self):
+        Builder.load_file('design.kv')
         Window.bind(on_drop_file=self._on_file_drop)
         self.main_widget = MainWidget()
+        STARTUP_TIMES["build"] = time.perf_counter()
         return self.main_widget
 
+    def on_start(self):
+        Window.bind(on_flip=self.on_first_frame)
+
+    def on_first_frame(self, window):
+        Window.unbind(on_flip=self.on_first_frame)
+        STARTUP_TIMES["first_frame"] = time.perf_counter()
+        if os.environ.get('STARTUP_BENCHMARK'):
+            start = STARTUP_TIMES["start"]
+            print("STARTUP " + json.dumps({name: mark - start for name, mark in STARTUP_TIMES.items()}))
+            self.stop()
+
+    def on_stop(self):
+        self.main_widget.stop_watch()
+        self.main_widget.cancel_analysis()
+        if self.main_widget.analysis_thread is not None:
+            self.main_widget.analysis_thread.join()
+        self.main_widget.sentiment_cache.close()
+        self.main_widget.sentiment_model.close()
+
     def _on_file_drop(self, window, file_path, *args):
         decoded_path = file_path.decode('utf-8')
         if decoded_path.endswith('.csv'):
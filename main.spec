@@ -7,6 +7,8 @@ a = Analysis(
     binaries=[],
     datas=[
         ('mainapp.kv', '.'),  
+        ('*.joblib', '.'),
+        ('category_rules.json', '.'),
         ('Assets/*', 'Assets'),
     ],
     hiddenimports=['sklearn'],
@@ -0,0 +1,140 @@
+"""
+Opt-in instrumentation of analysis runs.
+
+Set SURVEY_PROFILE to a .jsonl path (or to 1 for profile.jsonl) and every
+analysis run appends one JSON record there: wall time per stage, row and
+comment counts, sentiment cache hit ratios and the peak memory of the
+process, plus the device it ran on so records from different phones and
+releases can be compared. The app also shows the last record in a debug
+overlay. Without SURVEY_PROFILE nothing is measured.
+"""
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_FILE = 'profile.jsonl'
+
+
+def profile_path():
+    """Log file named by $SURVEY_PROFILE, or None when profiling is off."""
+    value = os.environ.get('SURVEY_PROFILE', '')
+    if value in ('', '0'):
+        return None
+    return PROFILE_FILE if value == '1' else value
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process so far, None where unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+class NullProfile:
+    """Stands in for a RunProfile when profiling is off."""
+
+    def stage(self, name):
+        return nullcontext()
+
+    def count(self, name, value=1):
+        pass
+
+
+NULL_PROFILE = NullProfile()
+
+
+class RunProfile:
+    """
+    Measurements of one analysis run.
+
+    stage() times a block and adds it to that stage's total, so a stage run
+    once per chunk ends up with its time over the whole file. count() adds
+    to a named counter the same way.
+    """
+
+    def __init__(self, csv_file, cache=None):
+        self.csv_file = csv_file
+        self.stages = {}
+        self.counts = {}
+        self.cache = cache
+        self._cache_stats = cache.stats() if cache is not None else None
+        self._start = time.perf_counter()
+        self.record = None
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0) + time.perf_counter() - start
+
+    def count(self, name, value=1):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def finish(self, **extra):
+        """Builds the record of the run; extra keys are added as they are."""
+        record = {
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "file": self.csv_file,
+            "device": platform.platform(),
+            "python": platform.python_version(),
+            "wall": time.perf_counter() - self._start,
+            "stages": self.stages,
+            "counts": self.counts,
+            "peak_memory_mb": peak_memory_mb(),
+        }
+
+        distinct = self.counts.get("distinct_comments", 0)
+        if distinct:
+            record["comment_cache_hit_ratio"] = 1 - self.counts.get("predicted_comments", 0) / distinct
+        if self.cache is not None:
+            # Counters of the in-memory layer of the sentiment cache, for this run only.
+            before, after = self._cache_stats, self.cache.stats()
+            hits = after["hits"] - before["hits"]
+            misses = after["misses"] - before["misses"]
+            record["memory_cache"] = {
+                "hits": hits,
+                "misses": misses,
+                "evictions": after["evictions"] - before["evictions"],
+                "hit_ratio": hits / (hits + misses) if hits + misses else 0,
+            }
+        record.update(extra)
+        self.record = record
+        return record
+
+    def write(self, path):
+        """Appends the record (see finish) to the log at path."""
+        append_record(path, self.record or self.finish())
+
+
+def append_record(path, record):
+    """Appends one record to a JSONL log."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def summary_text(record):
+    """Short multi-line text of a record, for the debug overlay."""
+    lines = [f"{os.path.basename(record['file'])}  {record['wall']:.2f} s"]
+    for name, seconds in record["stages"].items():
+        lines.append(f"{name}: {seconds * 1000:.0f} ms")
+    for name, value in record["counts"].items():
+        lines.append(f"{name}: {value}")
+    if "comment_cache_hit_ratio" in record:
+        lines.append(f"cache hit: {record['comment_cache_hit_ratio']:.0%}")
+    if record["peak_memory_mb"] is not None:
+        lines.append(f"peak memory: {record['peak_memory_mb']:.0f} MB")
+    return "\n".join(lines)
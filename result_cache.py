@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from analysis import SurveySummary
+
+RESULT_CACHE_DIR = 'result_cache'
+MAX_ENTRIES = 50
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def content_digest():
+    """New hashlib object for the content hash; fed the file's bytes, its hexdigest is file_hash."""
+    return hashlib.blake2b(digest_size=16)
+
+
+def file_hash(path):
+    """blake2b of the file content, read in blocks."""
+    digest = content_digest()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Whole-file analysis results, addressed by the content of the CSV.
+
+    Each entry is the SurveySummary of one file content, stored as
+    <content hash>.json. The content hash is not computed up front: the
+    analysis feeds the bytes it reads to a content_digest() and hands the
+    hash to store() at the end, with the (size, mtime) fingerprint taken
+    before the read. lookup() finds an unchanged path by that fingerprint
+    alone. Only a file with the size of a cached one (a copy, a rename, a
+    file touched but not edited) is hashed before it is read, so a new
+    file is read once. Keys include a context string (the category rule
+    table signature) so results computed under other rules are not
+    reused.
+
+    Entries whose path changed and is no longer referenced are deleted,
+    and the least recently used ones beyond max_entries are evicted.
+    """
+
+    def __init__(self, directory=RESULT_CACHE_DIR, max_entries=MAX_ENTRIES, context=''):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.context = context
+        self.index_file = os.path.join(directory, 'index.json')
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {"paths": {}, "entries": {}}
+        return self._index
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_file = self.index_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_file, self.index_file)
+
+    def _entry_file(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    @staticmethod
+    def content_digest():
+        return content_digest()
+
+    def fingerprint(self, csv_file):
+        """[size, mtime_ns] of the file, to take before it is read."""
+        stat = os.stat(csv_file)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _key(self, content_hash):
+        return hashlib.blake2b(f"{content_hash}:{self.context}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def _remember(self, path, fingerprint, key):
+        with self._lock:
+            index = self._load_index()
+            old = index["paths"].get(path)
+            index["paths"][path] = fingerprint + [key, self.context]
+            if old is not None and old[2] != key:
+                self._forget_if_unused(old[2])
+            self._save_index()
+
+    def lookup(self, csv_file, fingerprint):
+        """The cached SurveySummary of the file with this fingerprint, or None."""
+        path = os.path.abspath(csv_file)
+        # THE KEY OF A PATH IS ONLY REUSED UNDER THE CONTEXT IT WAS HASHED WITH
+        with self._lock:
+            paths = self._load_index()["paths"]
+            known = paths.get(path)
+            unchanged = known is not None and known[:2] == fingerprint and known[3:] == [self.context]
+            same_size = any(other[0] == fingerprint[0] and other[3:] == [self.context] for other in paths.values())
+        if unchanged:
+            return self.get(known[2], csv_file)
+        if not same_size:
+            return None
+
+        # MAYBE A COPY OR RENAME OF A CACHED FILE: ONLY THE CONTENT TELLS
+        key = self._key(file_hash(path))
+        summary = self.get(key, csv_file)
+        if summary is not None:
+            self._remember(path, fingerprint, key)
+        return summary
+
+    def store(self, csv_file, fingerprint, content_hash, summary):
+        """Caches the summary of the file content hashed while it was read, unless the file changed since fingerprint."""
+        path = os.path.abspath(csv_file)
+        if self.fingerprint(path) != fingerprint:
+            return
+        key = self._key(content_hash)
+        self.put(key, summary)
+        self._remember(path, fingerprint, key)
+
+    def get(self, key, csv_file=None):
+        """The cached SurveySummary, or None."""
+        with self._lock:
+            index = self._load_index()
+            if key not in index["entries"]:
+                return None
+            try:
+                summary = SurveySummary.load(self._entry_file(key))
+            except (OSError, ValueError, KeyError):
+                self._forget(key)
+                self._save_index()
+                return None
+            index["entries"][key] = time.time()
+            self._save_index()
+
+        if csv_file is not None:
+            summary.files = [csv_file]
+        return summary
+
+    def put(self, key, summary):
+        with self._lock:
+            index = self._load_index()
+            os.makedirs(self.directory, exist_ok=True)
+            summary.save(self._entry_file(key))
+            index["entries"][key] = time.time()
+
+            excess = len(index["entries"]) - self.max_entries
+            for old_key in sorted(index["entries"], key=index["entries"].get)[:max(excess, 0)]:
+                self._forget(old_key)
+            self._save_index()
+
+    def _forget_if_unused(self, key):
+        if all(known[2] != key for known in self._index["paths"].values()):
+            self._forget(key)
+
+    def _forget(self, key):
+        self._index["entries"].pop(key, None)
+        self._index["paths"] = {path: known for path, known in self._index["paths"].items() if known[2] != key}
+        try:
+            os.remove(self._entry_file(key))
+        except OSError:
+            pass
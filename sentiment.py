@@ -0,0 +1,186 @@
+import copy
+import os
+import threading
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_FILE = 'naive_bayes_model.joblib'
+VECTORIZER_FILE = 'tfidf_vectorizer.joblib'
+ENCODER_FILE = 'label_encoder.joblib'
+
+# OPT-IN: PROCESSES TO SHARD LARGE BATCHES ACROSS (1 PREDICTS IN-PROCESS)
+WORKERS = int(os.environ.get('SENTIMENT_WORKERS', '1'))
+PARALLEL_MIN_COMMENTS = 2000
+
+# CANONICAL KEYS ARE ONLY USED WHEN AT LEAST DEDUP_MIN_SHARE OF THE FIRST
+# DEDUP_SAMPLE COMMENTS OF A BATCH ARE DUPLICATES OF ANOTHER ONE'S KEY
+DEDUP_SAMPLE = 2000
+DEDUP_MIN_SHARE = 0.3
+
+
+class SentimentModel:
+    """
+    Naive Bayes sentiment classifier.
+
+    The model, TF-IDF vectorizer and label encoder are only read from disk
+    (and joblib/scikit-learn only imported) the first time a prediction is
+    needed, so creating the object costs nothing at startup.
+
+    Before the TF-IDF transform, comments are reduced to a canonical key
+    (see canonical_key) and only the distinct keys are vectorized and
+    classified; the labels are then fanned back out to every comment. Keys
+    only merge comments the vectorizer would turn into the same features,
+    so "N/A", "n/a" and "-" share one prediction without changing any
+    label. Computing the keys costs about half a transform, so a batch
+    whose first comments are nearly all different skips it.
+
+    With workers > 1, batches of at least PARALLEL_MIN_COMMENTS comments
+    are split into one shard per worker of a process pool. Each worker
+    loads the artifacts once, and the predictions come back in the
+    original order. submit() starts such a batch without waiting for it,
+    so the caller can queue the next batch (see analysis.analyze_csv) and
+    the workers are not left idle between batches.
+    """
+
+    def __init__(self, directory=MODEL_DIR, workers=WORKERS):
+        self.directory = directory
+        self.workers = workers
+        self.model = None
+        self.vectorizer = None
+        self.encoder = None
+        self._lock = threading.Lock()
+        self._pool = None
+        self._keys = None
+
+    @property
+    def loaded(self):
+        return self.model is not None
+
+    def load(self):
+        with self._lock:
+            if self.model is not None:
+                return
+            import joblib
+
+            self.vectorizer = joblib.load(os.path.join(self.directory, VECTORIZER_FILE))
+            self.encoder = joblib.load(os.path.join(self.directory, ENCODER_FILE))
+            self.model = joblib.load(os.path.join(self.directory, MODEL_FILE))
+            self._keys = _canonical_keys(self.vectorizer)
+
+    def predict(self, comments):
+        """Predicts the sentiment label of every comment in one batch."""
+        if not comments:
+            return []
+        if self.workers > 1 and len(comments) >= PARALLEL_MIN_COMMENTS:
+            return self.submit(comments)()
+        self.load()
+        if self._keys is None:
+            return self._classify(self.vectorizer, comments)
+
+        # Comments that preprocess (e.g. lowercase) the same are tokenized once.
+        preprocess, canonical_key, key_vectorizer = self._keys
+        texts = list(map(preprocess, comments))
+        keys = {text: canonical_key(text) for text in dict.fromkeys(texts[:DEDUP_SAMPLE])}
+        if len(set(keys.values())) > min(len(texts), DEDUP_SAMPLE) * (1 - DEDUP_MIN_SHARE):
+            return self._classify(self.vectorizer, comments)
+        for text in dict.fromkeys(texts[DEDUP_SAMPLE:]):
+            if text not in keys:
+                keys[text] = canonical_key(text)
+
+        unique = list(dict.fromkeys(keys.values()))
+        labels = dict(zip(unique, self._classify(key_vectorizer, unique)))
+        return [labels[keys[text]] for text in texts]
+
+    def _classify(self, vectorizer, texts):
+        features = vectorizer.transform(texts)
+        return self.encoder.inverse_transform(self.model.predict(features)).tolist()
+
+    def canonical_key(self, comment):
+        """The text the comment is vectorized as, without what has no effect on the features."""
+        self.load()
+        if self._keys is None:
+            return comment
+        preprocess, canonical_key, key_vectorizer = self._keys
+        return canonical_key(preprocess(comment))
+
+    def submit(self, comments):
+        """
+        Starts predicting the comments and returns a function that waits for
+        their labels. Only batches that go to the process pool keep running
+        in the background; smaller ones are predicted before returning.
+        """
+        if not (self.workers > 1 and len(comments) >= PARALLEL_MIN_COMMENTS):
+            predictions = self.predict(comments)
+            return lambda: predictions
+        futures = self._submit_shards(comments)
+        return lambda: [label for future in futures for label in future.result()]
+
+    def _submit_shards(self, comments):
+        with self._lock:
+            if self._pool is None:
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._pool = ProcessPoolExecutor(
+                    self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.directory,)
+                )
+            pool = self._pool
+
+        size = -(-len(comments) // self.workers)
+        return [pool.submit(_predict_shard, comments[i:i + size]) for i in range(0, len(comments), size)]
+
+    def close(self):
+        """Shuts the worker processes down, if any were started."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+def _canonical_keys(vectorizer):
+    """
+    (preprocess, key of a preprocessed comment, vectorizer for the keys),
+    or None when comments cannot be reduced for this vectorizer (a custom
+    analyzer or tokenizer).
+
+    A key is the comment as the vectorizer's own preprocessing and
+    tokenization see it, without the words it would drop (stop words, and
+    with single-word features anything outside the vocabulary), so it gets
+    the same features as the comment. With single-word features the word
+    order does not matter either: the words are sorted, and the keys can
+    be vectorized by a copy that just splits them on spaces.
+    """
+    if getattr(vectorizer, 'analyzer', None) != 'word' or vectorizer.tokenizer is not None:
+        return None
+    preprocess = vectorizer.build_preprocessor()
+    if vectorizer.preprocessor is None and not vectorizer.strip_accents:
+        # What the default preprocessor does, without its Python-level call.
+        preprocess = str.lower if vectorizer.lowercase else str
+    tokenize = vectorizer.build_tokenizer()
+
+    if tuple(vectorizer.ngram_range) == (1, 1):
+        in_vocabulary = vectorizer.vocabulary_.__contains__
+        key_vectorizer = copy.copy(vectorizer)
+        key_vectorizer.analyzer = str.split
+        return (preprocess,
+                lambda text: " ".join(sorted(filter(in_vocabulary, tokenize(text)))),
+                key_vectorizer)
+
+    stop_words = vectorizer.get_stop_words() or frozenset()
+    return (preprocess,
+            lambda text: " ".join(token for token in tokenize(text) if token not in stop_words),
+            vectorizer)
+
+
+# MODEL OF A PARALLEL WORKER PROCESS, LOADED ONCE BY THE POOL INITIALIZER
+_worker_model = None
+
+
+def _init_worker(directory):
+    global _worker_model
+    _worker_model = SentimentModel(directory, workers=1)
+    _worker_model.load()
+
+
+def _predict_shard(comments):
+    return _worker_model.predict(comments)
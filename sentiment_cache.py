@@ -0,0 +1,345 @@
+import bisect
+import hashlib
+import mmap
+import os
+import threading
+from array import array
+from collections import OrderedDict
+
+CACHE_FILE = 'sentiment_cache'
+
+LABELS = ('Negative', 'Neutral', 'Positive')
+LABEL_CODES = {label: code for code, label in enumerate(LABELS)}
+
+# VERSION 1 INDEXES COULD HOLD THE PLACEHOLDER LABELS OF THE OLD sentiment_cache.json
+INDEX_MAGIC = b'SCIDX\x00\x00\x02'
+HEADER_SIZE = 16
+RECORD_SIZE = 9
+COMPACT_MIN_RECORDS = 4096
+COMPACT_MAX_RECORDS = 65536
+MEMORY_CACHE_SIZE = 10000
+
+
+# TRANSFORM
+def normalize_comment(text):
+    """Case- and whitespace-insensitive form of a comment."""
+    return " ".join(text.split()).casefold()
+
+
+def comment_key(text):
+    """64-bit hash of the normalized comment, used as the cache key."""
+    digest = hashlib.blake2b(normalize_comment(text).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class LRUCache:
+    """Bounded key -> value map that evicts the least recently used entry."""
+
+    def __init__(self, maxsize=MEMORY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0,
+        }
+
+
+class SentimentCache:
+    """
+    Persistent comment -> sentiment cache.
+
+    Entries are keyed by comment_key and live in two files:
+
+    - <path>.idx: compacted entries, sorted keys followed by label codes. It
+      is memory-mapped and searched in place, so opening it does not read
+      the entries into memory.
+    - <path>.log: 9-byte records (key, label code) appended since the last
+      compaction. Only new predictions are ever written here.
+
+    Once the log grows past a quarter of the index (at least
+    COMPACT_MIN_RECORDS, at most COMPACT_MAX_RECORDS), it is merged into a
+    new index on a background thread. The log entries are also kept in a
+    dict for lookups, so the cap bounds that dict however large the index
+    gets; writes wait for a running compaction once the log reaches twice
+    the cap. The labels of the old sentiment_cache.json were random
+    placeholders, not predictions, so it is not imported; an index from
+    before that (version 1) is dropped on open and its comments predicted
+    again.
+
+    Lookups go through an LRUCache of at most memory_size entries; its
+    counters are available from stats(). Since keys are hashes of the
+    normalized comment, "N/A", "N/a" and "n/a" share one entry.
+
+    A read_only cache never writes: new entries stay pending until they are
+    taken with take_pending() and handed to the process owning the files
+    with put_records(). Taking them also drops them from the dict, so a
+    read-only cache that lives through many files (a cli.py worker) does
+    not grow with them; the in-memory layer keeps the ones still in use.
+    """
+
+    def __init__(self, path=CACHE_FILE, memory_size=MEMORY_CACHE_SIZE, read_only=False):
+        self.index_file = path + '.idx'
+        self.log_file = path + '.log'
+        self.memory = LRUCache(memory_size)
+        self.read_only = read_only
+
+        self._lock = threading.RLock()
+        self._opened = False
+        self._mmap = None
+        self._keys = ()
+        self._labels = b''
+        self._recent = {}
+        self._pending = []
+        self._compactor = None
+
+    def __len__(self):
+        self.open()
+        return len(self._keys) + sum(1 for key in self._recent if self._find(key) is None)
+
+    # LOAD
+    def open(self):
+        if self._opened:
+            return
+        with self._lock:
+            if self._opened:
+                return
+            self._map_index()
+            self._recent = self._read_log()
+            self._opened = True
+
+    def _map_index(self):
+        self._keys = ()
+        self._labels = b''
+        if not os.path.exists(self.index_file) or os.path.getsize(self.index_file) <= HEADER_SIZE:
+            return
+        with open(self.index_file, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:8] != INDEX_MAGIC:
+            outdated = self._mmap[:5] == INDEX_MAGIC[:5]
+            self._unmap_index()
+            if not outdated:
+                raise ValueError(f"{self.index_file} is not a sentiment cache index")
+            print(f"Warning: {self.index_file} is an older cache version, its comments will be predicted again.")
+            if not self.read_only:
+                os.remove(self.index_file)
+            return
+        count = int.from_bytes(self._mmap[8:HEADER_SIZE], 'little')
+        view = memoryview(self._mmap)
+        self._keys = view[HEADER_SIZE:HEADER_SIZE + count * 8].cast('Q')
+        self._labels = view[HEADER_SIZE + count * 8:HEADER_SIZE + count * 9]
+
+    def _unmap_index(self):
+        if isinstance(self._keys, memoryview):
+            self._keys.release()
+            self._labels.release()
+        self._keys = ()
+        self._labels = b''
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _read_log(self):
+        entries = {}
+        if not os.path.exists(self.log_file):
+            return entries
+        with open(self.log_file, 'rb') as f:
+            data = f.read()
+        # A torn record at the end (crash mid-append) is ignored, and cut off
+        # so the records appended next stay aligned.
+        torn = len(data) % RECORD_SIZE
+        if torn and not self.read_only:
+            with open(self.log_file, 'r+b') as f:
+                f.truncate(len(data) - torn)
+        for offset in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+            key = int.from_bytes(data[offset:offset + 8], 'little')
+            entries[key] = data[offset + 8]
+        return entries
+
+    # LOOKUP
+    def _find(self, key):
+        keys = self._keys
+        position = bisect.bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            return self._labels[position]
+        return None
+
+    def get(self, comment, default=None):
+        self.open()
+        key = comment_key(comment)
+        with self._lock:
+            code = self.memory.get(key)
+            if code is None:
+                code = self._recent.get(key)
+                if code is None:
+                    code = self._find(key)
+                if code is not None:
+                    self.memory.put(key, code)
+        return default if code is None else LABELS[code]
+
+    def stats(self):
+        """Hit, miss and eviction counters of the in-memory layer."""
+        with self._lock:
+            return self.memory.stats()
+
+    def __contains__(self, comment):
+        return self.get(comment) is not None
+
+    # STORE
+    def put(self, comment, label):
+        self.put_records([(comment_key(comment), LABEL_CODES[label])])
+
+    def put_records(self, records):
+        """Stores (key, label code) pairs, as returned by take_pending()."""
+        self.open()
+        with self._lock:
+            for key, code in records:
+                if self._recent.get(key, self._find(key)) == code:
+                    continue
+                self._recent[key] = code
+                self._pending.append((key, code))
+                self.memory.put(key, code)
+
+    def update(self, predictions):
+        self.put_records([(comment_key(comment), LABEL_CODES[label]) for comment, label in predictions])
+
+    def take_pending(self):
+        """Removes and returns the entries not written yet."""
+        with self._lock:
+            records, self._pending = self._pending, []
+            if self.read_only:
+                # THE OWNING PROCESS HAS THEM NOW
+                for key, code in records:
+                    self._recent.pop(key, None)
+        return records
+
+    def flush(self):
+        """Appends the new entries to the log and compacts when it grew large."""
+        with self._lock:
+            if self.read_only or not self._pending:
+                return
+            records = bytearray()
+            for key, code in self._pending:
+                records += key.to_bytes(8, 'little')
+                records.append(code)
+            with open(self.log_file, 'ab') as f:
+                f.write(records)
+            self._pending = []
+            recent = len(self._recent)
+            threshold = min(max(COMPACT_MIN_RECORDS, len(self._keys) // 4), COMPACT_MAX_RECORDS)
+
+        if recent >= threshold:
+            # A LOG TWICE THE CAP MEANS COMPACTION FELL BEHIND THE WRITES: WAIT FOR IT
+            self.compact(wait=recent >= 2 * COMPACT_MAX_RECORDS)
+
+    # COMPACT
+    def compact(self, wait=False):
+        """Merges the log into the index on a background thread."""
+        if self.read_only:
+            return
+        self.open()
+        with self._lock:
+            if self._compactor is None or not self._compactor.is_alive():
+                self.flush()
+                snapshot = dict(self._recent)
+                self._compactor = threading.Thread(target=self._compact, args=(snapshot,), daemon=True)
+                self._compactor.start()
+            compactor = self._compactor
+        if wait:
+            compactor.join()
+
+    def _compact(self, snapshot):
+        tmp_file = self.index_file + '.tmp'
+        self._write_index(tmp_file, self._merge(sorted(snapshot.items())))
+
+        with self._lock:
+            self._unmap_index()
+            os.replace(tmp_file, self.index_file)
+            self._map_index()
+
+            self._recent = {key: code for key, code in self._recent.items() if snapshot.get(key) != code}
+            self._pending = []
+            records = bytearray()
+            for key, code in self._recent.items():
+                records += key.to_bytes(8, 'little')
+                records.append(code)
+            with open(self.log_file + '.tmp', 'wb') as f:
+                f.write(records)
+            os.replace(self.log_file + '.tmp', self.log_file)
+
+    def _merge(self, recent):
+        """Sorted (key, code) pairs of the index with the recent entries applied."""
+        keys, labels = self._keys, self._labels
+        i = j = 0
+        while i < len(keys) and j < len(recent):
+            if keys[i] < recent[j][0]:
+                yield keys[i], labels[i]
+                i += 1
+            else:
+                if keys[i] == recent[j][0]:
+                    i += 1
+                yield recent[j]
+                j += 1
+        while i < len(keys):
+            yield keys[i], labels[i]
+            i += 1
+        yield from recent[j:]
+
+    @staticmethod
+    def _write_index(path, entries):
+        keys = array('Q')
+        labels = bytearray()
+        for key, code in entries:
+            keys.append(key)
+            labels.append(code)
+        with open(path, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(len(keys).to_bytes(8, 'little'))
+            f.write(keys.tobytes())
+            f.write(labels)
+
+    def close(self):
+        """Writes pending entries, waits for a running compaction and unmaps."""
+        if not self._opened:
+            return
+        self.flush()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            self._unmap_index()
+            self._recent = {}
+            self.memory.clear()
+            self._opened = False
@@ -0,0 +1,167 @@
+"""
+Watch mode: follow a survey CSV that keeps growing while responses come
+in, and analyze only the rows appended since the last look.
+"""
+import csv
+import io
+import os
+
+from analysis import (SENTIMENTS, AnalysisError, RatingStore, SurveySummary, check_cancelled,
+                      classify_comments)
+from categories import default_rules
+from profiling import NULL_PROFILE
+
+# BYTES PARSED PER STEP, SO CATCHING UP WITH A BIG FILE STAYS IN BOUNDED MEMORY
+WATCH_BLOCK = 1 << 20
+
+
+def complete_end(data):
+    """Length of the whole records at the start of data: up to its last line break outside quotes."""
+    end = data.rfind(b'\n')
+    while end != -1 and data.count(b'"', 0, end) % 2:
+        end = data.rfind(b'\n', 0, end)
+    return end + 1
+
+
+class SurveyTail:
+    """
+    Byte offset into a growing survey file and the results of the rows
+    before it.
+
+    update() reads from the offset to the end of the file and keeps only
+    whole records; a last line still being written (no line break yet, or
+    an open quote) is left for the next call. Many exports end without a
+    final line break, so when the file has not grown since the previous
+    update, a last line with balanced quotes counts as a whole record (and
+    the line break written before the next one is skipped). changed() asks
+    for that one extra update. The new rows go into the
+    same RatingStore, whose histograms only count rows added since they
+    were last asked for, and only their comments are classified, so the
+    cost of an update follows the number of new rows, not the size of the
+    file. A file that got shorter was rewritten and is read again from the
+    start. The offset only moves past a block once its rows are counted,
+    so a cancelled or failed update is simply picked up by the next one.
+    """
+
+    def __init__(self, csv_file, rules=None):
+        self.csv_file = csv_file
+        self.rules = rules or default_rules()
+        self.seen_size = None
+        self.sentiment_error = None
+        self.reset()
+
+    def reset(self):
+        self.offset = 0
+        self.store = None
+        self.comment_index = None
+        self.counts = dict.fromkeys(SENTIMENTS, 0)
+        self.unterminated = False
+        self.retry_tail = False
+
+    def changed(self):
+        """True when the file size moved since the last update, or a held back last line is due another look; one stat, safe on the UI thread."""
+        try:
+            return os.path.getsize(self.csv_file) != self.seen_size or self.retry_tail
+        except OSError:
+            return False
+
+    def _rows(self, data):
+        rows = list(csv.reader(io.StringIO(data.decode('utf-8'), newline='')))
+        if self.store is None:
+            header = rows.pop(0)
+            self.store = RatingStore(header, self.rules)
+            self.comment_index = self.rules.find_comment_column(header)
+        return rows
+
+    def read_records(self):
+        """(rows, bytes, ends with a line break) of the whole records after the offset, one per block."""
+        with open(self.csv_file, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < self.offset or not self.offset:
+                self.reset()
+            settled = size == self.seen_size
+
+            if self.unterminated and size > self.offset:
+                # THE LINE BREAK THAT WAS MISSING AFTER THE LAST RECORD COUNTED
+                file.seek(self.offset)
+                lead = file.read(2)
+                self.offset += 2 if lead == b'\r\n' else 1 if lead[:1] == b'\n' else 0
+                self.unterminated = False
+            file.seek(self.offset)
+
+            remaining = size - self.offset
+            pending = b''
+            while remaining > 0:
+                data = file.read(min(WATCH_BLOCK, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                data = pending + data
+                end = complete_end(data)
+                pending = data[end:]
+                if not end:
+                    continue
+
+                yield self._rows(data[:end]), end, True
+
+            # NO LINE BREAK AFTER THE LAST RECORD: WHOLE ONLY IF THE FILE STOPPED GROWING
+            if pending and settled and not pending.count(b'"') % 2:
+                yield self._rows(pending), len(pending), False
+                pending = b''
+            self.retry_tail = bool(pending) and not settled
+            self.seen_size = size
+
+    def update(self, model, cache, cancel_event=None, profile=NULL_PROFILE):
+        """
+        Adds the rows appended since the last call; returns a result dict
+        like analysis.analyze_csv, plus "new_rows". Like analyze_csv, a
+        sentiment model that cannot run only leaves the sentiments out.
+        """
+        new_rows = 0
+        records = self.read_records()
+        try:
+            while True:
+                check_cancelled(cancel_event)
+                try:
+                    with profile.stage("read"):
+                        rows, length, terminated = next(records)
+                except StopIteration:
+                    break
+                except (OSError, UnicodeDecodeError, csv.Error) as e:
+                    raise AnalysisError("File Read Error", f"Error reading the file: {e}")
+
+                sentiments = []
+                index = self.comment_index
+                if index is not None and rows and self.sentiment_error is None:
+                    comments = [row[index] if index < len(row) else '' for row in rows]
+                    try:
+                        sentiments = classify_comments(comments, model, cache, profile)
+                    except Exception as e:
+                        # THE RATINGS STILL COUNT; SENTIMENTS STAY OFF FOR THE REST OF THE WATCH
+                        self.sentiment_error = f"Error running the sentiment model: {e}"
+                        print(f"Warning: {self.sentiment_error}")
+
+                # THE BLOCK COUNTS ONLY ONCE IT IS FULLY PROCESSED, A FAILED ONE IS READ AGAIN NEXT TIME
+                for row in rows:
+                    self.store.add_row(row)
+                for sentiment in SENTIMENTS:
+                    self.counts[sentiment] += sentiments.count(sentiment)
+                self.offset += length
+                self.unterminated = not terminated
+                new_rows += len(rows)
+        finally:
+            records.close()
+        profile.count("rows", new_rows)
+
+        with profile.stage("summary"):
+            if self.store is None:
+                summary = SurveySummary(files=[self.csv_file])
+            else:
+                summary = SurveySummary.from_store(self.store, self.counts, [self.csv_file])
+            return {
+                "summary": summary,
+                "summary_index": summary.summary_index(),
+                "fraction": 1.0,
+                "new_rows": new_rows,
+                "sentiment_error": self.sentiment_error,
+            }